@@ -406,22 +406,21 @@ def generate_tests(generate_gherkin: bool, generate_selenium: bool, generate_pla
     try:
         detail_container.info("🔧 Initializing test generation engine and connecting to LLM...")
 
-        generator = TestGenerator()
-
-        detail_container.info(f"📄 Starting generation from: **{requirement.filename}**")
-
-        # Generate tests
-        suite = generator.generate_test_suite(
-            requirement=requirement,
-            client_context=client_context,
-            generate_gherkin=generate_gherkin,
-            generate_selenium=generate_selenium,
-            generate_playwright=generate_playwright,
-            include_edge_cases=include_edge,
-            include_negative=include_negative,
-            include_boundary=include_boundary,
-            progress_callback=update_progress
-        )
+        with TestGenerator() as generator:
+            detail_container.info(f"📄 Starting generation from: **{requirement.filename}**")
+
+            # Generate tests
+            suite = generator.generate_test_suite(
+                requirement=requirement,
+                client_context=client_context,
+                generate_gherkin=generate_gherkin,
+                generate_selenium=generate_selenium,
+                generate_playwright=generate_playwright,
+                include_edge_cases=include_edge,
+                include_negative=include_negative,
+                include_boundary=include_boundary,
+                progress_callback=update_progress
+            )
 
         st.session_state.test_suite = suite
 
@@ -1385,7 +1384,7 @@ def render_settings_page():
 
         # Auto-detect codellama from available models
         use_code_model = True
-        ollama_code_model = getattr(settings, 'ollama_code_model', 'codellama:7b')
+        ollama_code_model = settings.ollama_code_model
 
         try:
             if available_models:
@@ -1413,7 +1412,7 @@ def render_settings_page():
             "Request Timeout (seconds)",
             min_value=60,
             max_value=1800,
-            value=getattr(settings, 'ollama_timeout', 600),
+            value=settings.ollama_timeout,
             step=60,
             help="Increase this if generation times out. Local models can be slow on CPU."
         )
@@ -19,6 +19,7 @@ BASE_DIR = Path(__file__).parent.parent
 # This prevents data leakage between users
 USER_DATA_DIR = Path.home() / ".smar-test"
 DB_PATH = USER_DATA_DIR / "app.db"
+RESPONSE_CACHE_PATH = USER_DATA_DIR / "llm_cache.db"
 
 # Legacy paths (kept for backward compatibility, but not used)
 DATA_DIR = BASE_DIR / "data"
@@ -53,6 +54,7 @@ class Settings:
     hf_model_id: str = "meta-llama/Llama-3.1-8B-Instruct"
     hf_use_api: bool = True  # Default to API mode (cloud) since it's more accessible
     hf_api_token: str = ""
+    hf_quantization: str = None  # Local models only: 8bit, 4bit (needs bitsandbytes + CUDA), or None
 
     # Online API settings
     openai_api_key: str = ""
@@ -71,9 +73,22 @@ class Settings:
     vllm_max_model_len: int = None  # Maximum sequence length (None = model default)
     vllm_dtype: str = "auto"  # Data type: auto, float16, bfloat16, float32
     vllm_quantization: str = None  # Quantization: awq, gptq, squeezellm, or None
+    vllm_kv_cache_dtype: str = None  # KV cache dtype: auto, fp8, fp8_e5m2, or None (fp8 on Ada/Hopper GPUs)
+    vllm_enable_prefix_caching: bool = True  # Reuse KV cache for shared prompt prefixes (e.g. system prompts)
     vllm_timeout: int = 600  # Request timeout in seconds
 
+    # LLM response cache (identical prompts are answered from memory)
+    llm_cache_enabled: bool = False
+    llm_cache_size: int = 256  # Max cached responses (least recently used are evicted)
+    llm_cache_persist: bool = False  # Also keep responses on disk across app restarts
+
+    # Client-side rate limits for the LLM provider (0 = unlimited)
+    llm_max_rpm: int = 0  # Requests per minute
+    llm_max_tpm: int = 0  # Tokens per minute (tiktoken for OpenAI if installed, else estimated)
+    llm_max_concurrent: int = 0  # Requests in flight at once
+
     # Generation settings
+    enable_prompt_compression: bool = False  # Compress requirements text with LLMLingua-2 (needs llmlingua)
     include_edge_cases: bool = True
     include_negative_tests: bool = True
     include_boundary_tests: bool = True
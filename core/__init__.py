@@ -1,7 +1,23 @@
 # Core module
-from .llm_adapter import LLMAdapter, get_llm_adapter
-from .document_parser import DocumentParser
-from .test_generator import TestGenerator
-from .export_handler import ExportHandler
+# Submodules are imported on first attribute access, so `import core.llm_adapter`
+# does not also pull in the document parser and export handler (openpyxl etc.).
+import importlib
+
+_EXPORTS = {
+    'LLMAdapter': '.llm_adapter',
+    'get_llm_adapter': '.llm_adapter',
+    'DocumentParser': '.document_parser',
+    'TestGenerator': '.test_generator',
+    'ExportHandler': '.export_handler',
+}
 
 __all__ = ['LLMAdapter', 'get_llm_adapter', 'DocumentParser', 'TestGenerator', 'ExportHandler']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -11,6 +11,88 @@ from typing import List, Dict, Any, Optional, Tuple
 from models.test_case import ManualTestCase, AutomationScript, TestSuite
 from storage.file_manager import get_file_manager, FileManager
 
+try:
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.utils import get_column_letter
+    _OPENPYXL_OK = True
+except ImportError:
+    _OPENPYXL_OK = False
+
+if _OPENPYXL_OK:
+    # Shared Excel styles (built once, reused across exports)
+    _HEADER_FONT = Font(bold=True, color="FFFFFF")
+    _HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    _HEADER_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    _CELL_ALIGN = Alignment(vertical="top", wrap_text=True)
+    _THIN_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    # Priority colors
+    _PRIORITY_FILLS = {
+        "High": PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"),
+        "Medium": PatternFill(start_color="FFF9C4", end_color="FFF9C4", fill_type="solid"),
+        "Low": PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"),
+    }
+
+
+# Pre-bound Markdown templates (avoid rebuilding f-strings per test/step)
+_MD_HEADER_TMPL = (
+    "# Test Suite: {name}\n"
+    "\n"
+    "**Client:** {client}\n"
+    "**Source:** {source}\n"
+    "**Generated:** {generated}\n"
+    "**Total Tests:** {total}\n"
+    "\n"
+    "---\n"
+    "\n"
+    "## Summary\n"
+    "\n"
+    "| Priority | Count |\n"
+    "|----------|-------|\n"
+).format
+_MD_TEST_TMPL = (
+    "### {test_id}: {name}\n"
+    "\n"
+    "**Priority:** {priority} | **Category:** {category} | **Status:** {status}\n"
+    "\n"
+    "**Description:** {description}\n"
+    "\n"
+).format
+_MD_STEPS_HEADER = (
+    "**Test Steps:**\n"
+    "\n"
+    "| Step | Action | Test Data | Expected Result |\n"
+    "|------|--------|-----------|-----------------|\n"
+)
+_MD_STEP_TMPL = "| {n} | {a} | {d} | {e} |\n".format
+
+
+def _gherkin_filename(name: str) -> str:
+    """Ensure a Gherkin script filename ends with .feature."""
+    if not name.endswith('.feature'):
+        name += '.feature'
+    return name
+
+
+def _selenium_filename(name: str) -> str:
+    """Ensure a Selenium script filename ends with .py."""
+    if not name.endswith('.py'):
+        name += '.py'
+    return name
+
+
+def _playwright_filename(name: str) -> str:
+    """Ensure a Playwright script filename ends with .spec.js."""
+    if name.endswith('.js'):
+        name = name.removesuffix('.js').removesuffix('.spec')
+    return name + '.spec.js'
+
 
 class ExportHandler:
     """
@@ -31,11 +113,7 @@ class ExportHandler:
         Returns:
             Tuple of (file bytes, filename)
         """
-        try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-            from openpyxl.utils import get_column_letter
-        except ImportError:
+        if not _OPENPYXL_OK:
             raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
 
         # Create workbook
@@ -43,25 +121,6 @@ class ExportHandler:
         ws = wb.active
         ws.title = "Manual Test Cases"
 
-        # Define styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell_alignment = Alignment(vertical="top", wrap_text=True)
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # Priority colors
-        priority_fills = {
-            "High": PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"),
-            "Medium": PatternFill(start_color="FFF9C4", end_color="FFF9C4", fill_type="solid"),
-            "Low": PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"),
-        }
-
         # Headers (Standard QA format)
         headers = [
             "Test ID", "Test Name", "Description", "Preconditions",
@@ -74,60 +133,42 @@ class ExportHandler:
         # Write headers
         for col, (header, width) in enumerate(zip(headers, column_widths), 1):
             cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
+            cell.font = _HEADER_FONT
+            cell.fill = _HEADER_FILL
+            cell.alignment = _HEADER_ALIGN
+            cell.border = _THIN_BORDER
             ws.column_dimensions[get_column_letter(col)].width = width
 
+        def set_cell(row: int, column: int, value: Any):
+            """Write a data cell with border and alignment in one pass."""
+            cell = ws.cell(row=row, column=column, value=value)
+            cell.border = _THIN_BORDER
+            cell.alignment = _CELL_ALIGN
+            return cell
+
         # Write test cases
         for row, test in enumerate(test_suite.manual_tests, 2):
-            # Test ID
-            ws.cell(row=row, column=1, value=test.test_id).border = thin_border
-
-            # Test Name
-            ws.cell(row=row, column=2, value=test.test_name).border = thin_border
-
-            # Description
-            ws.cell(row=row, column=3, value=test.description).border = thin_border
-
-            # Preconditions
-            preconditions = test.get_preconditions_text()
-            ws.cell(row=row, column=4, value=preconditions).border = thin_border
-
-            # Test Steps
-            steps = test.get_steps_text()
-            ws.cell(row=row, column=5, value=steps).border = thin_border
-
-            # Expected Results
-            expected = test.get_expected_results_text()
-            ws.cell(row=row, column=6, value=expected).border = thin_border
+            set_cell(row, 1, test.test_id)
+            set_cell(row, 2, test.test_name)
+            set_cell(row, 3, test.description)
+            set_cell(row, 4, test.get_preconditions_text())
+            set_cell(row, 5, test.get_steps_text())
+            set_cell(row, 6, test.get_expected_results_text())
 
             # Priority (with color)
-            priority_cell = ws.cell(row=row, column=7, value=test.priority)
-            priority_cell.border = thin_border
-            if test.priority in priority_fills:
-                priority_cell.fill = priority_fills[test.priority]
-
-            # Status
-            ws.cell(row=row, column=8, value=test.status).border = thin_border
+            priority_cell = set_cell(row, 7, test.priority)
+            if test.priority in _PRIORITY_FILLS:
+                priority_cell.fill = _PRIORITY_FILLS[test.priority]
 
-            # Category
-            ws.cell(row=row, column=9, value=test.category).border = thin_border
-
-            # Tags
-            tags = ", ".join(test.tags) if test.tags else ""
-            ws.cell(row=row, column=10, value=tags).border = thin_border
-
-            # Apply alignment to all cells in row
-            for col in range(1, len(headers) + 1):
-                ws.cell(row=row, column=col).alignment = cell_alignment
+            set_cell(row, 8, test.status)
+            set_cell(row, 9, test.category)
+            set_cell(row, 10, ", ".join(test.tags) if test.tags else "")
 
         # Freeze header row
         ws.freeze_panes = "A2"
 
-        # Auto-filter
-        ws.auto_filter.ref = ws.dimensions
+        # Auto-filter (range is known up front; avoids ws.dimensions scanning every cell)
+        ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{len(test_suite.manual_tests) + 1}"
 
         # Generate filename
         if not filename:
@@ -204,74 +245,66 @@ class ExportHandler:
         Returns:
             Tuple of (markdown content, filename)
         """
-        lines = [
-            f"# Test Suite: {test_suite.name}",
-            "",
-            f"**Client:** {test_suite.client_name or 'N/A'}",
-            f"**Source:** {test_suite.requirement_source or 'N/A'}",
-            f"**Generated:** {test_suite.generated_at or datetime.now().isoformat()}",
-            f"**Total Tests:** {len(test_suite.manual_tests)}",
-            "",
-            "---",
-            "",
-        ]
+        buf = io.StringIO()
+        w = buf.write
 
-        # Summary table
-        lines.append("## Summary")
-        lines.append("")
-        lines.append("| Priority | Count |")
-        lines.append("|----------|-------|")
+        w(_MD_HEADER_TMPL(
+            name=test_suite.name,
+            client=test_suite.client_name or 'N/A',
+            source=test_suite.requirement_source or 'N/A',
+            generated=test_suite.generated_at or datetime.now().isoformat(),
+            total=len(test_suite.manual_tests),
+        ))
 
+        # Summary table
         priority_counts = {"High": 0, "Medium": 0, "Low": 0}
         for test in test_suite.manual_tests:
             if test.priority in priority_counts:
                 priority_counts[test.priority] += 1
 
         for priority, count in priority_counts.items():
-            lines.append(f"| {priority} | {count} |")
-
-        lines.append("")
-        lines.append("---")
-        lines.append("")
+            w(f"| {priority} | {count} |\n")
 
-        # Test cases
-        lines.append("## Test Cases")
-        lines.append("")
+        w("\n---\n\n## Test Cases\n")
 
+        # Test cases (each block is preceded by the blank separator line)
         for test in test_suite.manual_tests:
-            lines.append(f"### {test.test_id}: {test.test_name}")
-            lines.append("")
-            lines.append(f"**Priority:** {test.priority} | **Category:** {test.category} | **Status:** {test.status}")
-            lines.append("")
-            lines.append(f"**Description:** {test.description}")
-            lines.append("")
+            w("\n")
+            w(_MD_TEST_TMPL(
+                test_id=test.test_id,
+                name=test.test_name,
+                priority=test.priority,
+                category=test.category,
+                status=test.status,
+                description=test.description,
+            ))
 
             if test.preconditions:
-                lines.append("**Preconditions:**")
+                w("**Preconditions:**\n")
                 for pre in test.preconditions:
-                    lines.append(f"- {pre}")
-                lines.append("")
+                    w(f"- {pre}\n")
+                w("\n")
 
-            lines.append("**Test Steps:**")
-            lines.append("")
-            lines.append("| Step | Action | Test Data | Expected Result |")
-            lines.append("|------|--------|-----------|-----------------|")
+            w(_MD_STEPS_HEADER)
             for step in test.test_steps:
-                lines.append(f"| {step.step_number} | {step.action} | {step.test_data or '-'} | {step.expected_result or '-'} |")
-            lines.append("")
+                w(_MD_STEP_TMPL(
+                    n=step.step_number,
+                    a=step.action,
+                    d=step.test_data or '-',
+                    e=step.expected_result or '-',
+                ))
+            w("\n")
 
             if test.expected_results:
-                lines.append("**Expected Results:**")
+                w("**Expected Results:**\n")
                 for i, result in enumerate(test.expected_results, 1):
-                    lines.append(f"{i}. {result}")
-                lines.append("")
+                    w(f"{i}. {result}\n")
+                w("\n")
 
             if test.tags:
-                lines.append(f"**Tags:** {', '.join(test.tags)}")
-                lines.append("")
+                w(f"**Tags:** {', '.join(test.tags)}\n\n")
 
-            lines.append("---")
-            lines.append("")
+            w("---\n")
 
         # Generate filename
         if not filename:
@@ -282,7 +315,7 @@ class ExportHandler:
                 "md"
             )
 
-        return "\n".join(lines), filename
+        return buf.getvalue(), filename
 
     def export_gherkin_files(self, test_suite: TestSuite) -> List[Tuple[str, str]]:
         """
@@ -294,13 +327,7 @@ class ExportHandler:
         Returns:
             List of (content, filename) tuples
         """
-        files = []
-        for script in test_suite.gherkin_scripts:
-            filename = script.filename
-            if not filename.endswith('.feature'):
-                filename += '.feature'
-            files.append((script.content, filename))
-        return files
+        return [(s.content, _gherkin_filename(s.filename)) for s in test_suite.gherkin_scripts]
 
     def export_selenium_files(self, test_suite: TestSuite) -> List[Tuple[str, str]]:
         """
@@ -312,13 +339,7 @@ class ExportHandler:
         Returns:
             List of (content, filename) tuples
         """
-        files = []
-        for script in test_suite.selenium_scripts:
-            filename = script.filename
-            if not filename.endswith('.py'):
-                filename += '.py'
-            files.append((script.content, filename))
-        return files
+        return [(s.content, _selenium_filename(s.filename)) for s in test_suite.selenium_scripts]
 
     def export_playwright_files(self, test_suite: TestSuite) -> List[Tuple[str, str]]:
         """
@@ -330,16 +351,7 @@ class ExportHandler:
         Returns:
             List of (content, filename) tuples
         """
-        files = []
-        for script in test_suite.playwright_scripts:
-            filename = script.filename
-            if not filename.endswith('.spec.js'):
-                if filename.endswith('.js'):
-                    filename = filename[:-3] + '.spec.js'
-                else:
-                    filename += '.spec.js'
-            files.append((script.content, filename))
-        return files
+        return [(s.content, _playwright_filename(s.filename)) for s in test_suite.playwright_scripts]
 
     def export_all_as_zip(self, test_suite: TestSuite, export_format: str = "excel") -> Tuple[bytes, str]:
         """
@@ -366,17 +378,15 @@ class ExportHandler:
                 content, fname = self.export_to_markdown(test_suite)
                 zipf.writestr(f"manual_tests/{fname}", content)
 
-            # Export Gherkin files
-            for content, fname in self.export_gherkin_files(test_suite):
-                zipf.writestr(f"gherkin/{fname}", content)
+            # Export automation scripts straight from the suite (no intermediate lists)
+            for script in test_suite.gherkin_scripts:
+                zipf.writestr(f"gherkin/{_gherkin_filename(script.filename)}", script.content)
 
-            # Export Selenium files
-            for content, fname in self.export_selenium_files(test_suite):
-                zipf.writestr(f"selenium/{fname}", content)
+            for script in test_suite.selenium_scripts:
+                zipf.writestr(f"selenium/{_selenium_filename(script.filename)}", script.content)
 
-            # Export Playwright files
-            for content, fname in self.export_playwright_files(test_suite):
-                zipf.writestr(f"playwright/{fname}", content)
+            for script in test_suite.playwright_scripts:
+                zipf.writestr(f"playwright/{_playwright_filename(script.filename)}", script.content)
 
             # Add a README
             readme = self._generate_readme(test_suite)
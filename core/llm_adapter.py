@@ -3,17 +3,465 @@ Unified LLM Adapter supporting multiple providers.
 Ollama (Local), HuggingFace (Local/API), OpenAI, Groq, Anthropic.
 """
 import json
+import queue
+import logging
+import socket
+import asyncio
+import gc
+import hashlib
+import inspect
+import functools
+import threading
+import time
+import weakref
 import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any, Generator
-from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Generator, AsyncGenerator, Callable, Iterable, Tuple
+from dataclasses import asdict, dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config.settings import get_settings, Settings
 from config.llm_config import LLMProvider
+from storage.response_store import ResponseStore, get_response_store
 
+logger = logging.getLogger(__name__)
 
-class BaseLLMAdapter(ABC):
-    """Abstract base class for LLM adapters."""
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is optional; stdlib json also accepts bytes
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Request bodies are pre-serialized to bytes and sent with data=, so the
+# content type has to be set explicitly.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Disable Nagle so small streamed frames are not held back waiting for ACKs,
+# and enable keep-alive probes so idle pooled connections are detected dead.
+_SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+class _SocketOptionsAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections are opened with `_SOCKET_OPTIONS`."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = _SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Retry policy for pooled sessions: 429s only, never re-sending a request
+# that timed out mid-read. backoff_jitter needs urllib3>=2; on 1.26 the
+# backoff is simply unjittered.
+_RETRY_KWARGS: Dict[str, Any] = dict(
+    total=2,
+    read=0,
+    backoff_factor=0.2,
+    status_forcelist=(429,),
+    allowed_methods=None,
+    raise_on_status=False,
+)
+if "backoff_jitter" in inspect.signature(Retry.__init__).parameters:
+    _RETRY_KWARGS["backoff_jitter"] = 0.2
+
+
+def _build_session(pool_connections: int = 16, pool_maxsize: int = 32) -> requests.Session:
+    """Create a keep-alive session with a pooled, lightly retrying transport.
+
+    Reusing one session per adapter keeps TCP/TLS connections open between
+    calls instead of paying a fresh handshake on every request. 429 responses
+    are retried with jittered backoff (honouring Retry-After); requests that
+    timed out mid-read are not re-sent, since generation may be under way.
+    """
+    session = requests.Session()
+    adapter = _SocketOptionsAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(**_RETRY_KWARGS),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _iter_lines(response: requests.Response, chunk_size: int = 8192) -> Generator[bytes, None, None]:
+    """Yield non-empty newline-delimited byte lines from a streamed response.
+
+    Splits a reusable bytearray buffer fed by ``iter_content`` instead of
+    ``iter_lines``, so lines are never decoded to str before JSON parsing.
+    """
+    buf = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buf += chunk
+        start = 0
+        # Slice through a memoryview so each line is copied once, straight
+        # into its bytes object, and hand it to the caller immediately. Only
+        # this generator resizes buf, and the view is released before it does.
+        with memoryview(buf) as view:
+            while (end := buf.find(b"\n", start)) != -1:
+                line = bytes(view[start:end]).rstrip(b"\r")
+                start = end + 1
+                if line:
+                    yield line
+        del buf[:start]
+    if buf.strip():
+        yield bytes(buf)
+
+
+def _iter_sse_data(response: requests.Response, chunk_size: int = 65536) -> Generator[bytes, None, None]:
+    """Yield the `data:` payloads of a server-sent event stream until [DONE].
+
+    Event streams are sent with chunked transfer encoding, so reads return
+    as each HTTP chunk arrives; the large `chunk_size` only bounds how much
+    a burst of events is read in one go.
+    """
+    for line in _iter_lines(response, chunk_size=chunk_size):
+        # Per the SSE spec a single space may follow the colon; slicing it off
+        # avoids the extra copy a strip() would make for every event.
+        if line.startswith(b"data: "):
+            data = line[6:]
+        elif line.startswith(b"data:"):
+            data = line[5:]
+        else:
+            continue
+        if data == b"[DONE]":
+            break
+        if data:
+            yield data
+
+
+def _parse_error(response: requests.Response) -> str:
+    """Extract a short error message from a failed API response.
+
+    Only small JSON bodies are decoded; anything else (e.g. a proxy's HTML
+    error page) is reported as its first 200 bytes.
+    """
+    content_type = response.headers.get("content-type", "")
+    try:
+        length = int(response.headers.get("content-length", "0"))
+    except ValueError:
+        length = 0
+    if content_type.startswith("application/json") and length < 4096:
+        try:
+            error = _json_loads(response.content)
+        except ValueError:
+            pass
+        else:
+            if isinstance(error, dict):
+                detail = error.get("error", error)
+                if isinstance(detail, dict):
+                    detail = detail.get("message", str(detail))
+                return str(detail)
+    return response.content[:200].decode("utf-8", "replace")
+
+
+def _chat_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Build an OpenAI-style chat message list."""
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _format_messages(prompt: str, system_prompt: Optional[str] = None) -> str:
+    """Join system and user prompts for completion-style (non-chat) endpoints."""
+    if system_prompt:
+        return f"{system_prompt}\n\n{prompt}"
+    return prompt
+
+
+class _TTLCache:
+    """Small thread-safe mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 64, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# Availability probes are cached so UI re-renders don't re-hit the network.
+# Only definite answers are stored; failed requests are retried next time.
+_availability_cache = _TTLCache(maxsize=64, ttl=300.0)
+# Local Ollama tags change as models are pulled, so they expire sooner.
+_ollama_tags_cache = _TTLCache(maxsize=16, ttl=30.0)
+# Server model listings, and short-lived up/down results for hot polling.
+_models_cache = _TTLCache(maxsize=32, ttl=60.0)
+_probe_cache = _TTLCache(maxsize=64, ttl=5.0)
+
+
+def clear_probe_caches() -> None:
+    """Forget cached availability checks and model listings."""
+    for cache in (_availability_cache, _ollama_tags_cache, _models_cache, _probe_cache):
+        cache.clear()
+
+
+# Loaded local models shared by every adapter in the process, keyed by the
+# full load configuration with the provider first. Streamlit re-runs the
+# script and rebuilds adapters constantly; without this each rebuild would
+# reload the weights. Only one model per provider is kept, so switching
+# models in the sidebar doesn't leave the old one on the GPU. Entries are
+# Futures, so a load runs outside the lock and concurrent callers wait on it.
+_MODEL_CACHE: Dict[tuple, Future] = {}
+# Batch workers for cached engines that cannot be called concurrently; one
+# per engine, under the same key, so all adapters funnel through it.
+_MODEL_BATCHERS: Dict[tuple, Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def _load_shared_model(key: tuple, loader: Callable[[], Any]) -> Any:
+    """Return the cached model for `key`, loading it once if needed.
+
+    A cached model of the same provider with a different key is evicted,
+    and its memory released, before the new one is loaded. The lock is only
+    held to update the cache: loading and eviction don't block other keys.
+    """
+    with _MODEL_CACHE_LOCK:
+        future = _MODEL_CACHE.get(key)
+        loading = future is None
+        if loading:
+            stale = [
+                (_MODEL_CACHE.pop(k), _MODEL_BATCHERS.pop(k, None))
+                for k in [k for k in _MODEL_CACHE if k[0] == key[0]]
+            ]
+            future = _MODEL_CACHE[key] = Future()
+
+    if not loading:
+        return future.result()
+
+    if stale:
+        _release_models(stale)
+    try:
+        model = loader()
+    except BaseException as e:
+        with _MODEL_CACHE_LOCK:
+            if _MODEL_CACHE.get(key) is future:
+                del _MODEL_CACHE[key]
+        future.set_exception(e)
+        raise
+    future.set_result(model)
+    return model
+
+
+def _release_models(entries: List[tuple]) -> None:
+    """Stop the batch workers of evicted (model, batcher) entries and free GPU memory.
+
+    Empties `entries`, so the caller holds no reference to the models.
+    """
+    for _, batcher in entries:
+        if batcher is not None:
+            batcher.stop()
+    entries.clear()
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+def _shared_batcher(key: tuple, generate_fn: Callable[[List[str]], List[str]]) -> "_BatchWorker":
+    """Return the one batch worker feeding the cached model for `key`.
+
+    `generate_fn` is only used when the worker is first started.
+    """
+    with _MODEL_CACHE_LOCK:
+        batcher = _MODEL_BATCHERS.get(key)
+        if batcher is None:
+            if key not in _MODEL_CACHE:
+                raise RuntimeError("Model was unloaded by a switch to another model")
+            batcher = _MODEL_BATCHERS[key] = _BatchWorker(generate_fn)
+        return batcher
+
+
+def _request_key(adapter: Any, prompt: str, system_prompt: Optional[str]) -> bytes:
+    """Digest of the inputs that determine an adapter's response.
+
+    Wrappers (caching, rate limiting) are unwrapped so the key names the
+    provider and model that actually answer, not the wrapper class.
+    """
+    while getattr(adapter, 'inner', None) is not None:
+        adapter = adapter.inner
+    model = getattr(adapter, 'model', None) or getattr(adapter, 'model_id', '')
+    raw = "\x00".join((type(adapter).__name__, model, system_prompt or "", prompt))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1 if text else 0
+
+
+@functools.lru_cache(maxsize=None)
+def _tiktoken_encoding(model: str):
+    """Load (once per model) the tiktoken encoding, or None without tiktoken."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@functools.lru_cache(maxsize=4096)
+def _tiktoken_count(model: str, text: str) -> int:
+    """Exact token count for OpenAI models; repeated prompts hit the cache."""
+    return len(_tiktoken_encoding(model).encode(text))
+
+
+def _coalesce_chunks(
+    chunks: Iterable[str], max_wait: float, max_chunks: int = 8
+) -> Generator[str, None, None]:
+    """Join consecutive stream deltas into fewer, larger chunks.
+
+    Deltas are buffered until `max_chunks` have arrived or `max_wait`
+    seconds have passed since the first buffered one, then yielded as one
+    string; the remainder is flushed when the stream ends. The wait is only
+    checked as deltas arrive, so a stall upstream also delays the buffer.
+    """
+    buf: List[str] = []
+    deadline = 0.0
+    for chunk in chunks:
+        now = time.monotonic()
+        if not buf:
+            deadline = now + max_wait
+        buf.append(chunk)
+        if len(buf) >= max_chunks or now >= deadline:
+            yield "".join(buf)
+            buf.clear()
+    if buf:
+        yield "".join(buf)
+
+
+async def _aiter_in_thread(make_iter: Callable[[], Any]) -> AsyncGenerator[Any, None]:
+    """Drive a blocking iterator in a worker thread and yield its items asynchronously."""
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def emit(item: Any, error: Optional[BaseException] = None) -> None:
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, (item, error))
+        except RuntimeError:  # Event loop already closed
+            stop.set()
+
+    def produce() -> None:
+        iterator = make_iter()
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                emit(item)
+        except BaseException as e:
+            emit(end, e)
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        emit(end)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item, error = await items.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        # The worker notices on its next item and closes the stream
+        stop.set()
+
+
+class SingleFlightMixin:
+    """Collapse concurrent identical generate() calls into one LLM request.
+
+    The first caller for a key performs the request; callers arriving while
+    it is in flight wait on the same Future and share its result or error.
+    """
+
+    __slots__ = ()
+
+    _inflight: Dict[bytes, Future] = {}
+    _inflight_lock = threading.Lock()
+
+    def _single_flight(self, key: bytes, fn: Callable[[], str]) -> str:
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def coalesced_generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate, sharing the result with identical requests already in flight."""
+        key = _request_key(self, prompt, system_prompt)
+        return self._single_flight(key, lambda: self.generate(prompt, system_prompt))
+
+
+class BaseLLMAdapter(SingleFlightMixin, ABC):
+    """Abstract base class for LLM adapters.
+
+    Adapters declare ``__slots__`` (no per-instance ``__dict__``); subclasses
+    must list every attribute they assign.
+    """
+
+    __slots__ = ("__weakref__",)
 
     @abstractmethod
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
@@ -35,14 +483,65 @@ class BaseLLMAdapter(ABC):
         """Get available models."""
         pass
 
+    def count_tokens(self, text: str) -> int:
+        """Approximate number of tokens `text` uses with this adapter's model."""
+        return _estimate_tokens(text)
+
+    def warmup(self) -> None:
+        """Best-effort: open a connection to the provider ahead of the first request.
+
+        The default does nothing; network adapters override it so the first
+        generate() reuses a warm, pooled TLS connection.
+        """
+
+    def close(self) -> None:
+        """Release pooled connections and other resources held by the adapter."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate text without blocking the event loop.
+
+        Runs the blocking ``generate`` call in a worker thread, so many prompts
+        can be in flight at once while each adapter keeps its pooled session.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
+    async def abatch_generate(self, prompts: List[str], system_prompt: Optional[str] = None) -> List[Any]:
+        """Generate responses for several independent prompts concurrently.
+
+        Returns results in prompt order; a failed prompt yields its exception
+        instead of aborting the whole batch.
+        """
+        tasks = [self.agenerate(prompt, system_prompt) for prompt in prompts]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def agenerate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """Stream text without blocking the event loop.
+
+        The blocking ``generate_stream`` runs in a worker thread and hands
+        chunks to the loop as they arrive. Leaving the ``async for`` early
+        stops the worker and closes the underlying stream.
+        """
+        async for chunk in _aiter_in_thread(lambda: self.generate_stream(prompt, system_prompt)):
+            yield chunk
+
 
 class OllamaAdapter(BaseLLMAdapter):
     """Ollama local LLM adapter."""
 
+    __slots__ = ("base_url", "model", "timeout", "_base_model", "_session")
+
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "mistral:latest", timeout: int = 600):
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout  # 10 minutes default for complex prompts
+        self._base_model = model.split(":")[0]
+        self._session = _build_session()
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using Ollama."""
@@ -62,9 +561,9 @@ class OllamaAdapter(BaseLLMAdapter):
             payload["system"] = system_prompt
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self._session.post(url, data=_json_dumps(payload), headers=_JSON_HEADERS, timeout=self.timeout)
             response.raise_for_status()
-            result = response.json()
+            result = _json_loads(response.content)
             return result.get("response", "")
         except requests.exceptions.ReadTimeout:
             raise ConnectionError(f"Ollama request timed out after {self.timeout}s. The model may be slow. Try a smaller/faster model or increase timeout.")
@@ -89,12 +588,18 @@ class OllamaAdapter(BaseLLMAdapter):
             payload["system"] = system_prompt
 
         try:
-            response = requests.post(url, json=payload, stream=True, timeout=self.timeout)
-            response.raise_for_status()
-
-            for line in response.iter_lines():
-                if line:
-                    data = json.loads(line)
+            response = self._session.post(
+                url, data=_json_dumps(payload), headers=_JSON_HEADERS, stream=True, timeout=self.timeout
+            )
+            # Closing on exit (including an early break or the consumer
+            # abandoning the stream) hands the connection back to the pool
+            # instead of leaving the rest of the body to be drained at GC.
+            with response:
+                response.raise_for_status()
+
+                loads = _json_loads  # Local lookup in the per-token loop
+                for line in _iter_lines(response):
+                    data = loads(line)
                     if "response" in data:
                         yield data["response"]
                     if data.get("done", False):
@@ -104,30 +609,66 @@ class OllamaAdapter(BaseLLMAdapter):
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Failed to connect to Ollama: {e}")
 
-    def is_available(self) -> bool:
-        """Check if Ollama is running and model is available."""
+    def _fetch_model_names(self) -> Optional[tuple]:
+        """Return (ordered names, name set) from /api/tags, or None if unreachable.
+
+        Shared across adapter instances for the same server, so UI code that
+        builds a fresh adapter per render still polls Ollama at most every 30s.
+        """
+        cached = _ollama_tags_cache.get(self.base_url)
+        if cached is not None:
+            return cached
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                model_names = [m.get("name", "") for m in models]
-                # Check if our model exists (handle both "mistral:latest" and "mistral" formats)
-                base_model = self.model.split(":")[0]
-                return any(base_model in name for name in model_names)
-            return False
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code != 200:
+                return None
+            models = _json_loads(response.content).get("models", [])
         except:
+            return None
+        names = tuple(m["name"] for m in models if m.get("name"))
+        cached = (names, frozenset(names))
+        _ollama_tags_cache.set(self.base_url, cached)
+        return cached
+
+    def is_available(self) -> bool:
+        """Check if Ollama is running and model is available."""
+        cached = self._fetch_model_names()
+        if cached is None:
             return False
+        names, name_set = cached
+        if self.model in name_set:
+            return True
+        # Check if our model exists (handle both "mistral:latest" and "mistral" formats)
+        return any(name.startswith(self._base_model) for name in names)
 
     def get_models(self) -> List[str]:
         """Get available Ollama models."""
+        cached = self._fetch_model_names()
+        return list(cached[0]) if cached else []
+
+    def warmup(self) -> None:
+        """Open a pooled connection to the Ollama server."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                return [m.get("name", "") for m in models]
-            return []
-        except:
-            return []
+            self._session.head(self.base_url, timeout=5)
+        except requests.exceptions.RequestException:
+            pass
+
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self._session.close()
+
+
+# Models known to be served through HuggingFace Inference Providers.
+_HF_SUGGESTED_MODELS: Tuple[str, ...] = (
+    "meta-llama/Llama-3.1-8B-Instruct",
+    "meta-llama/Llama-3.3-70B-Instruct",
+    "Qwen/Qwen2.5-7B-Instruct",
+    "Qwen/Qwen2.5-Coder-32B-Instruct",
+    "mistralai/Mistral-7B-Instruct-v0.2",
+    "deepseek-ai/DeepSeek-R1-Distill-Qwen-7B",
+    "HuggingFaceTB/SmolLM3-3B",
+    "meta-llama/Llama-3.2-3B-Instruct",
+)
 
 
 class HuggingFaceAdapter(BaseLLMAdapter):
@@ -143,33 +684,121 @@ class HuggingFaceAdapter(BaseLLMAdapter):
     # Base URL for the HuggingFace router
     ROUTER_BASE = "https://router.huggingface.co"
 
-    def __init__(self, model_id: str, use_api: bool = False, api_token: Optional[str] = None):
+    # Generation parameters for the legacy text-generation payload
+    LEGACY_PARAMETERS = {
+        "max_new_tokens": 4096,
+        "temperature": 0.7,
+        "return_full_text": False,
+    }
+
+    __slots__ = (
+        "model_id", "use_api", "api_token", "quantization", "_pipeline", "_tokenizer", "_model_key", "_session",
+        "_headers", "_routed_model", "_chat_url", "_legacy_url", "_models_url",
+    )
+
+    def __init__(
+        self,
+        model_id: str,
+        use_api: bool = False,
+        api_token: Optional[str] = None,
+        quantization: Optional[str] = None,
+    ):
+        """Initialize HuggingFace adapter.
+
+        Args:
+            model_id: HuggingFace model ID
+            use_api: Use Inference Providers (True) or local transformers (False)
+            api_token: HuggingFace API token (API mode)
+            quantization: Local weight quantization via bitsandbytes: "8bit", "4bit" or None
+        """
         self.model_id = model_id
         self.use_api = use_api
         self.api_token = api_token
+        self.quantization = quantization
         self._pipeline = None
         self._tokenizer = None
+        self._model_key = None
+        self._session = _build_session()
+
+        # Per-instance constants for the API request paths
+        self._headers = self._get_api_headers()
+        self._routed_model = self._get_routed_model_id()
+        self._chat_url = f"{self.ROUTER_BASE}/v1/chat/completions"
+        self._legacy_url = f"{self.ROUTER_BASE}/hf-inference/models/{self.model_id}"
+        self._models_url = f"{self.ROUTER_BASE}/v1/models"
 
     def _get_pipeline(self):
-        """Lazy load the transformers pipeline."""
-        if self._pipeline is None and not self.use_api:
+        """Lazy load the transformers pipeline (again, if it has been evicted)."""
+        if not self.use_api and (self._pipeline is None or self._model_key not in _MODEL_CACHE):
             try:
                 from transformers import pipeline, AutoTokenizer
                 import torch
 
                 device = "cuda" if torch.cuda.is_available() else "cpu"
-                self._tokenizer = AutoTokenizer.from_pretrained(self.model_id)
-                self._pipeline = pipeline(
-                    "text-generation",
-                    model=self.model_id,
-                    tokenizer=self._tokenizer,
-                    device=device,
-                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                )
+                if device != "cuda":
+                    torch_dtype = torch.float32
+                elif torch.cuda.is_bf16_supported():
+                    torch_dtype = torch.bfloat16
+                else:
+                    torch_dtype = torch.float16
+
+                def load():
+                    tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+                    kwargs = {
+                        "model": self.model_id,
+                        "tokenizer": tokenizer,
+                        "torch_dtype": torch_dtype,
+                    }
+
+                    model_kwargs = self._model_kwargs(device, torch_dtype)
+                    if model_kwargs.get("quantization_config") is not None:
+                        # Quantized weights are placed by accelerate, not moved with .to(device)
+                        kwargs["device_map"] = "auto"
+                    else:
+                        kwargs["device"] = device
+                    if model_kwargs:
+                        kwargs["model_kwargs"] = model_kwargs
+
+                    return tokenizer, pipeline("text-generation", **kwargs)
+
+                key = ("hf", self.model_id, device, str(torch_dtype), self.quantization)
+                self._tokenizer, self._pipeline = _load_shared_model(key, load)
+                self._model_key = key
             except ImportError:
                 raise ImportError("transformers and torch are required for local HuggingFace models")
         return self._pipeline
 
+    def _model_kwargs(self, device: str, torch_dtype: Any) -> Dict[str, Any]:
+        """Build optional model-loading kwargs for quantization and fused attention.
+
+        `torch_dtype` is the pipeline's dtype, reused as the 4-bit compute dtype.
+        """
+        if device != "cuda":
+            return {}
+
+        import importlib.util
+
+        model_kwargs: Dict[str, Any] = {}
+        if self.quantization in ("4bit", "8bit"):
+            try:
+                from transformers import BitsAndBytesConfig
+                import bitsandbytes  # noqa: F401
+            except ImportError:
+                logger.warning("bitsandbytes not installed, loading %s without quantization", self.model_id)
+            else:
+                if self.quantization == "4bit":
+                    model_kwargs["quantization_config"] = BitsAndBytesConfig(
+                        load_in_4bit=True,
+                        bnb_4bit_quant_type="nf4",
+                        bnb_4bit_compute_dtype=torch_dtype,
+                    )
+                else:
+                    model_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+
+        if importlib.util.find_spec("flash_attn") is not None:
+            model_kwargs["attn_implementation"] = "flash_attention_2"
+        return model_kwargs
+
     def _get_api_headers(self) -> Dict[str, str]:
         """Build authorization headers for the HuggingFace API."""
         headers = {"Content-Type": "application/json"}
@@ -192,15 +821,34 @@ class HuggingFaceAdapter(BaseLLMAdapter):
         if self.use_api:
             return self._generate_api(prompt, system_prompt)
         else:
-            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+            full_prompt = _format_messages(prompt, system_prompt)
             return self._generate_local(full_prompt)
 
+    def generate_many(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        concurrency: int = 8,
+    ) -> List[str]:
+        """Generate responses for independent prompts, preserving order.
+
+        In API mode the requests fan out over a thread pool that shares the
+        adapter's pooled session, so up to `concurrency` round-trips overlap.
+        Local pipelines run sequentially since they are compute-bound.
+        """
+        if not self.use_api or len(prompts) < 2:
+            return [self.generate(p, system_prompt) for p in prompts]
+
+        workers = max(1, min(concurrency, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda p: self._generate_api(p, system_prompt), prompts))
+
     def _generate_api(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate using HuggingFace Inference Providers (router.huggingface.co).
 
         Uses the OpenAI-compatible chat completions endpoint with automatic
-        provider routing (:fastest). Falls back to legacy text-generation
-        format if chat completions fails.
+        provider routing (:fastest). Only if that request fails is the legacy
+        text-generation endpoint tried.
         """
         if not self.api_token:
             raise ConnectionError(
@@ -209,123 +857,115 @@ class HuggingFaceAdapter(BaseLLMAdapter):
                 "(select 'Make calls to Inference Providers' permission)"
             )
 
-        headers = self._get_api_headers()
-        routed_model = self._get_routed_model_id()
-        last_error = None
+        content, chat_error = self._chat_attempt(prompt, system_prompt)
+        if content is not None:
+            return content
+        return self._legacy_fallback(prompt, system_prompt, chat_error)
 
-        # --- Approach 1: OpenAI-compatible Chat Completions (recommended) ---
-        try:
-            chat_url = f"{self.ROUTER_BASE}/v1/chat/completions"
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+    def _legacy_fallback(self, prompt: str, system_prompt: Optional[str], chat_error: str) -> str:
+        """Retry a failed chat request on the legacy endpoint; raise if that fails too."""
+        text, legacy_error = self._legacy_attempt(prompt, system_prompt)
+        if text is not None:
+            return text
+        status_code, error_detail = legacy_error
+
+        # Specific handling for 403 Forbidden
+        if status_code == 403:
+            raise ConnectionError(
+                f"Access Denied (403) - HuggingFace API\n\n"
+                f"Your API token doesn't have the required permissions.\n\n"
+                f"Fix this:\n"
+                f"  1. Go to: https://huggingface.co/settings/tokens\n"
+                f"  2. Click 'New token'\n"
+                f"  3. Enable 'Make calls to Inference Providers'\n"
+                f"  4. Copy the token and set it in your LLM Settings\n\n"
+                f"Error details: {error_detail}"
+            )
+
+        # If both approaches failed, give a helpful combined error
+        legacy_label = f"Legacy API ({status_code})" if status_code is not None else "Legacy API"
+        raise ConnectionError(
+            f"HuggingFace API failed for model '{self.model_id}'.\n"
+            f"  Chat Completions: {chat_error}\n"
+            f"  {legacy_label}: {error_detail}\n\n"
+            f"Possible fixes:\n"
+            f"  1. Verify your API token has 'Inference Providers' permission\n"
+            f"  2. Check model is available at: https://huggingface.co/models?inference_provider=all\n"
+            f"  3. Try a known working model: meta-llama/Llama-3.1-8B-Instruct or Qwen/Qwen2.5-7B-Instruct"
+        )
 
+    def _chat_attempt(self, prompt: str, system_prompt: Optional[str]) -> tuple:
+        """Approach 1: OpenAI-compatible Chat Completions (recommended).
+
+        Returns (content, None) on success or (None, error message).
+        """
+        try:
             chat_payload = {
-                "model": routed_model,
-                "messages": messages,
+                "model": self._routed_model,
+                "messages": _chat_messages(prompt, system_prompt),
                 "max_tokens": 4096,
                 "temperature": 0.7,
             }
 
-            response = requests.post(chat_url, headers=headers, json=chat_payload, timeout=180)
+            response = self._session.post(
+                self._chat_url, headers=self._headers, data=_json_dumps(chat_payload), timeout=180
+            )
 
-            # Parse error details before raising
             if response.status_code != 200:
-                error_detail = ""
-                try:
-                    err_json = response.json()
-                    error_detail = err_json.get("error", {})
-                    if isinstance(error_detail, dict):
-                        error_detail = error_detail.get("message", str(error_detail))
-                except:
-                    error_detail = response.text[:200]
-
-                # Specific handling for 403 Forbidden
-                if response.status_code == 403:
-                    last_error = f"Access Denied (403): Check your API token has 'Inference Providers' permission at https://huggingface.co/settings/tokens"
-                else:
-                    last_error = f"Chat API ({response.status_code}): {error_detail}"
-            else:
-                result = response.json()
-                if "choices" in result and len(result["choices"]) > 0:
-                    content = result["choices"][0].get("message", {}).get("content", "")
-                    if content:
-                        return content
-                last_error = "Chat API returned empty response"
-
-        except requests.exceptions.Timeout:
-            last_error = "Chat API request timed out (180s). Try a smaller model."
-        except requests.exceptions.ConnectionError as e:
-            last_error = f"Cannot reach router.huggingface.co: {e}"
-        except requests.exceptions.RequestException as e:
-            last_error = f"Chat API error: {e}"
+                return None, self._chat_status_error(response)
 
-        # --- Approach 2: Legacy HF Inference text-generation format ---
+            result = _json_loads(response.content)
+            if "choices" in result and len(result["choices"]) > 0:
+                content = result["choices"][0].get("message", {}).get("content", "")
+                if content:
+                    return content, None
+            return None, "Chat API returned empty response"
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return None, self._chat_request_error(e)
+
+    @staticmethod
+    def _chat_status_error(response: requests.Response) -> str:
+        """Describe a non-200 chat completions response."""
+        # Specific handling for 403 Forbidden
+        if response.status_code == 403:
+            return "Access Denied (403): Check your API token has 'Inference Providers' permission at https://huggingface.co/settings/tokens"
+        return f"Chat API ({response.status_code}): {_parse_error(response)}"
+
+    @staticmethod
+    def _chat_request_error(error: Exception) -> str:
+        """Describe a chat completions request that failed before a response."""
+        if isinstance(error, requests.exceptions.Timeout):
+            return "Chat API request timed out (180s). Try a smaller model."
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return f"Cannot reach router.huggingface.co: {error}"
+        return f"Chat API error: {error}"
+
+    def _legacy_attempt(self, prompt: str, system_prompt: Optional[str]) -> tuple:
+        """Approach 2: Legacy HF Inference text-generation format.
+
+        Returns (text, None) on success or (None, (status code, error detail));
+        the status code is None when the request itself failed.
+        """
         try:
-            legacy_url = f"{self.ROUTER_BASE}/hf-inference/models/{self.model_id}"
-            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-
-            legacy_payload = {
-                "inputs": full_prompt,
-                "parameters": {
-                    "max_new_tokens": 4096,
-                    "temperature": 0.7,
-                    "return_full_text": False,
-                }
-            }
+            full_prompt = _format_messages(prompt, system_prompt)
+            legacy_payload = {"inputs": full_prompt, "parameters": self.LEGACY_PARAMETERS}
 
-            response = requests.post(legacy_url, headers=headers, json=legacy_payload, timeout=180)
+            response = self._session.post(
+                self._legacy_url, headers=self._headers, data=_json_dumps(legacy_payload), timeout=180
+            )
 
             if response.status_code != 200:
-                error_detail = ""
-                try:
-                    err_json = response.json()
-                    error_detail = err_json.get("error", str(err_json))
-                except:
-                    error_detail = response.text[:200]
-
-                # Specific handling for 403 Forbidden
-                if response.status_code == 403:
-                    raise ConnectionError(
-                        f"Access Denied (403) - HuggingFace API\n\n"
-                        f"Your API token doesn't have the required permissions.\n\n"
-                        f"Fix this:\n"
-                        f"  1. Go to: https://huggingface.co/settings/tokens\n"
-                        f"  2. Click 'New token'\n"
-                        f"  3. Enable 'Make calls to Inference Providers'\n"
-                        f"  4. Copy the token and set it in your LLM Settings\n\n"
-                        f"Error details: {error_detail}"
-                    )
-
-                # If both approaches failed, give a helpful combined error
-                raise ConnectionError(
-                    f"HuggingFace API failed for model '{self.model_id}'.\n"
-                    f"  Chat Completions: {last_error}\n"
-                    f"  Legacy API ({response.status_code}): {error_detail}\n\n"
-                    f"Possible fixes:\n"
-                    f"  1. Verify your API token has 'Inference Providers' permission\n"
-                    f"  2. Check model is available at: https://huggingface.co/models?inference_provider=all\n"
-                    f"  3. Try a known working model: meta-llama/Llama-3.1-8B-Instruct or Qwen/Qwen2.5-7B-Instruct"
-                )
+                error_detail = _parse_error(response)
+                return None, (response.status_code, error_detail)
 
-            result = response.json()
+            result = _json_loads(response.content)
             if isinstance(result, list) and len(result) > 0:
-                return result[0].get("generated_text", "")
-            return ""
+                return result[0].get("generated_text", ""), None
+            return "", None
 
-        except ConnectionError:
-            raise  # Re-raise our custom error messages
-        except requests.exceptions.RequestException as e:
-            raise ConnectionError(
-                f"HuggingFace API failed for model '{self.model_id}'.\n"
-                f"  Chat Completions: {last_error}\n"
-                f"  Legacy API: {e}\n\n"
-                f"Possible fixes:\n"
-                f"  1. Verify your API token has 'Inference Providers' permission\n"
-                f"  2. Check model is available at: https://huggingface.co/models?inference_provider=all\n"
-                f"  3. Try a known working model: meta-llama/Llama-3.1-8B-Instruct or Qwen/Qwen2.5-7B-Instruct"
-            )
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return None, (None, e)
 
     def _generate_local(self, prompt: str) -> str:
         """Generate using local transformers."""
@@ -342,31 +982,80 @@ class HuggingFaceAdapter(BaseLLMAdapter):
         return ""
 
     def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
-        """Generate with streaming (falls back to non-streaming for HF)."""
-        result = self.generate(prompt, system_prompt)
-        chunk_size = 50
-        for i in range(0, len(result), chunk_size):
-            yield result[i:i + chunk_size]
+        """Generate with streaming.
+
+        API mode streams tokens from the router's chat completions endpoint.
+        Local pipelines cannot stream, so the full response is yielded once.
+        """
+        if self.use_api and self.api_token:
+            yield from self._generate_stream_api(prompt, system_prompt)
+        else:
+            yield self.generate(prompt, system_prompt)
+
+    def _generate_stream_api(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        """Stream chat completion deltas over server-sent events."""
+        chat_payload = {
+            "model": self._routed_model,
+            "messages": _chat_messages(prompt, system_prompt),
+            "max_tokens": 4096,
+            "temperature": 0.7,
+            "stream": True,
+        }
+
+        try:
+            response = self._session.post(
+                self._chat_url, headers=self._headers, data=_json_dumps(chat_payload), stream=True, timeout=180
+            )
+        except requests.exceptions.RequestException as e:
+            yield self._legacy_fallback(prompt, system_prompt, self._chat_request_error(e))
+            return
+
+        if response.status_code != 200:
+            with response:
+                chat_error = self._chat_status_error(response)
+            yield self._legacy_fallback(prompt, system_prompt, chat_error)
+            return
+
+        with response:
+            try:
+                loads = _json_loads  # Local lookup in the per-token loop
+                for data in _iter_sse_data(response):
+                    try:
+                        chunk = loads(data)
+                    except ValueError:
+                        continue
+                    choices = chunk.get("choices")
+                    if choices:
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+            except requests.exceptions.RequestException as e:
+                raise ConnectionError(f"HuggingFace streaming error: {e}")
 
     def is_available(self) -> bool:
         """Check if HuggingFace model is available."""
         if self.use_api:
             if not self.api_token:
                 return False
+            token_hash = hashlib.blake2b(self.api_token.encode("utf-8"), digest_size=8).hexdigest()
+            key = ("hf", self.model_id, token_hash)
+            cached = _availability_cache.get(key)
+            if cached is not None:
+                return cached
             try:
-                # Check model exists on HuggingFace Hub
-                url = f"https://huggingface.co/api/models/{self.model_id}"
-                response = requests.get(url, timeout=5)
-                if response.status_code != 200:
-                    return False
-
-                # Verify the token works with the router
-                headers = self._get_api_headers()
-                check_url = f"{self.ROUTER_BASE}/v1/models"
-                response = requests.get(check_url, headers=headers, timeout=5)
-                return response.status_code == 200
+                # Check the model exists on the Hub and the token works with
+                # the router; the two probes are independent, so overlap them.
+                hub_url = f"https://huggingface.co/api/models/{self.model_id}"
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    hub = pool.submit(self._session.head, hub_url, timeout=5, allow_redirects=True)
+                    router = pool.submit(
+                        self._session.get, self._models_url, headers=self._headers, timeout=5
+                    )
+                    available = hub.result().status_code == 200 and router.result().status_code == 200
             except:
                 return False
+            _availability_cache.set(key, available)
+            return available
         else:
             try:
                 from transformers import AutoConfig
@@ -377,30 +1066,125 @@ class HuggingFaceAdapter(BaseLLMAdapter):
 
     def get_models(self) -> List[str]:
         """Get suggested HuggingFace models available via Inference Providers."""
-        return [
-            "meta-llama/Llama-3.1-8B-Instruct",
-            "meta-llama/Llama-3.3-70B-Instruct",
-            "Qwen/Qwen2.5-7B-Instruct",
-            "Qwen/Qwen2.5-Coder-32B-Instruct",
-            "mistralai/Mistral-7B-Instruct-v0.2",
-            "deepseek-ai/DeepSeek-R1-Distill-Qwen-7B",
-            "HuggingFaceTB/SmolLM3-3B",
-            "meta-llama/Llama-3.2-3B-Instruct",
-        ]
-
-
-class OpenAIAdapter(BaseLLMAdapter):
+        return list(_HF_SUGGESTED_MODELS)
+
+    def warmup(self) -> None:
+        """Open a pooled TLS connection to the HuggingFace router (API mode)."""
+        if not self.use_api:
+            return
+        try:
+            self._session.head(self.ROUTER_BASE, timeout=5)
+        except requests.exceptions.RequestException:
+            pass
+
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self._session.close()
+
+
+def _sdk_http_kwargs() -> Dict[str, Any]:
+    """Extra SDK client kwargs that enable HTTP/2 when `h2` is installed.
+
+    The OpenAI, Groq and Anthropic SDKs all accept an httpx ``http_client``;
+    with HTTP/2, concurrent requests multiplex over one TLS connection. The
+    connect timeout is short so an unreachable host fails fast, while reads
+    keep the long budget that slow generations need.
+    """
+    try:
+        import h2  # noqa: F401
+        import httpx
+    except ImportError:
+        return {}
+    return {
+        "http_client": httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+    }
+
+
+class _SDKClientMixin:
+    """Build one provider SDK client lazily and reuse it across calls.
+
+    SDK clients wrap an HTTP connection pool, so constructing one per
+    request throws away keep-alive connections. Subclasses call
+    `_init_client()` from ``__init__`` and implement `_new_client()`.
+    """
+
+    __slots__ = ("_client", "_client_lock", "_client_finalizer")
+
+    def _init_client(self) -> None:
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._client_finalizer = None
+
+    def _new_client(self):
+        raise NotImplementedError
+
+    def _get_client(self):
+        client = self._client
+        if client is None:
+            with self._client_lock:
+                client = self._client
+                if client is None:
+                    client = self._client = self._new_client()
+                    # Close the pool when the adapter is collected or at exit.
+                    self._client_finalizer = weakref.finalize(self, client.close)
+        return client
+
+    def warmup(self) -> None:
+        """Build the SDK client and open its connection with a cheap model listing."""
+        if not self.api_key:
+            return
+        try:
+            self._get_client().models.list()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Close the cached SDK client, if one was created."""
+        with self._client_lock:
+            finalizer, self._client_finalizer = self._client_finalizer, None
+            self._client = None
+        if finalizer is not None:
+            finalizer()
+
+
+# Chat models offered in the OpenAI model picker.
+_OPENAI_MODELS: Tuple[str, ...] = (
+    "gpt-4",
+    "gpt-4-turbo",
+    "gpt-4o",
+    "gpt-4o-mini",
+    "gpt-3.5-turbo",
+)
+
+
+class OpenAIAdapter(_SDKClientMixin, BaseLLMAdapter):
     """OpenAI API adapter."""
 
+    __slots__ = ("api_key", "model")
+
     def __init__(self, api_key: str, model: str = "gpt-4"):
         self.api_key = api_key
         self.model = model
+        self._init_client()
+
+    def _new_client(self):
+        from openai import OpenAI
+        return OpenAI(api_key=self.api_key, **_sdk_http_kwargs())
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with tiktoken when installed, else estimate."""
+        if text and _tiktoken_encoding(self.model) is not None:
+            return _tiktoken_count(self.model, text)
+        return _estimate_tokens(text)
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using OpenAI."""
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            client = self._get_client()
 
             messages = []
             if system_prompt:
@@ -422,8 +1206,7 @@ class OpenAIAdapter(BaseLLMAdapter):
     def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
         """Generate with streaming."""
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            client = self._get_client()
 
             messages = []
             if system_prompt:
@@ -437,9 +1220,12 @@ class OpenAIAdapter(BaseLLMAdapter):
                 max_tokens=4096,
                 stream=True,
             )
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            try:
+                for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.response.close()
         except ImportError:
             raise ImportError("openai package is required for OpenAI models")
 
@@ -448,8 +1234,7 @@ class OpenAIAdapter(BaseLLMAdapter):
         if not self.api_key:
             return False
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            client = self._get_client()
             client.models.list()
             return True
         except:
@@ -457,21 +1242,37 @@ class OpenAIAdapter(BaseLLMAdapter):
 
     def get_models(self) -> List[str]:
         """Get available OpenAI models."""
-        return ["gpt-4", "gpt-4-turbo", "gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo"]
+        return list(_OPENAI_MODELS)
+
 
+# Chat models offered in the Groq model picker.
+_GROQ_MODELS: Tuple[str, ...] = (
+    "llama-3.1-70b-versatile",
+    "llama-3.1-8b-instant",
+    "llama-3.2-90b-text-preview",
+    "mixtral-8x7b-32768",
+    "gemma2-9b-it",
+)
 
-class GroqAdapter(BaseLLMAdapter):
+
+class GroqAdapter(_SDKClientMixin, BaseLLMAdapter):
     """Groq API adapter."""
 
+    __slots__ = ("api_key", "model")
+
     def __init__(self, api_key: str, model: str = "llama-3.1-70b-versatile"):
         self.api_key = api_key
         self.model = model
+        self._init_client()
+
+    def _new_client(self):
+        from groq import Groq
+        return Groq(api_key=self.api_key, **_sdk_http_kwargs())
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using Groq."""
         try:
-            from groq import Groq
-            client = Groq(api_key=self.api_key)
+            client = self._get_client()
 
             messages = []
             if system_prompt:
@@ -493,8 +1294,7 @@ class GroqAdapter(BaseLLMAdapter):
     def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
         """Generate with streaming."""
         try:
-            from groq import Groq
-            client = Groq(api_key=self.api_key)
+            client = self._get_client()
 
             messages = []
             if system_prompt:
@@ -508,9 +1308,12 @@ class GroqAdapter(BaseLLMAdapter):
                 max_tokens=4096,
                 stream=True,
             )
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            try:
+                for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.response.close()
         except ImportError:
             raise ImportError("groq package is required for Groq models")
 
@@ -519,8 +1322,7 @@ class GroqAdapter(BaseLLMAdapter):
         if not self.api_key:
             return False
         try:
-            from groq import Groq
-            client = Groq(api_key=self.api_key)
+            self._get_client()
             # Simple check
             return True
         except:
@@ -528,27 +1330,36 @@ class GroqAdapter(BaseLLMAdapter):
 
     def get_models(self) -> List[str]:
         """Get available Groq models."""
-        return [
-            "llama-3.1-70b-versatile",
-            "llama-3.1-8b-instant",
-            "llama-3.2-90b-text-preview",
-            "mixtral-8x7b-32768",
-            "gemma2-9b-it",
-        ]
+        return list(_GROQ_MODELS)
+
+
+# Chat models offered in the Anthropic model picker.
+_ANTHROPIC_MODELS: Tuple[str, ...] = (
+    "claude-3-opus-20240229",
+    "claude-3-sonnet-20240229",
+    "claude-3-haiku-20240307",
+    "claude-3-5-sonnet-20241022",
+)
 
 
-class AnthropicAdapter(BaseLLMAdapter):
+class AnthropicAdapter(_SDKClientMixin, BaseLLMAdapter):
     """Anthropic API adapter."""
 
+    __slots__ = ("api_key", "model")
+
     def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229"):
         self.api_key = api_key
         self.model = model
+        self._init_client()
+
+    def _new_client(self):
+        from anthropic import Anthropic
+        return Anthropic(api_key=self.api_key, **_sdk_http_kwargs())
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using Anthropic."""
         try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
+            client = self._get_client()
 
             kwargs = {
                 "model": self.model,
@@ -568,8 +1379,7 @@ class AnthropicAdapter(BaseLLMAdapter):
     def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
         """Generate with streaming."""
         try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
+            client = self._get_client()
 
             kwargs = {
                 "model": self.model,
@@ -590,20 +1400,152 @@ class AnthropicAdapter(BaseLLMAdapter):
         if not self.api_key:
             return False
         try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
+            self._get_client()
             return True
         except:
             return False
 
     def get_models(self) -> List[str]:
         """Get available Anthropic models."""
-        return [
-            "claude-3-opus-20240229",
-            "claude-3-sonnet-20240229",
-            "claude-3-haiku-20240307",
-            "claude-3-5-sonnet-20241022",
-        ]
+        return list(_ANTHROPIC_MODELS)
+
+
+class _BatchWorker:
+    """Background thread that groups prompts into batched engine calls.
+
+    Prompts submitted within `max_wait` seconds of each other (up to
+    `max_batch`) are passed to `generate_fn` as one list, letting engines
+    with continuous batching such as vLLM schedule them together.
+    """
+
+    def __init__(self, generate_fn: Callable[[List[str]], List[str]], max_batch: int = 32, max_wait: float = 0.01):
+        self.generate_fn = generate_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="llm-batch-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt: str) -> Future:
+        """Queue a prompt; the returned Future resolves to its completion."""
+        future: Future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Batch worker has been stopped")
+            self._queue.put((prompt, future))
+        return future
+
+    def stop(self) -> None:
+        """Finish queued work and stop the worker thread."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[tuple]) -> None:
+        pending = [(prompt, future) for prompt, future in batch if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+        try:
+            results = self.generate_fn([prompt for prompt, _ in pending])
+        except BaseException as e:
+            for _, future in pending:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(pending, results):
+                future.set_result(result)
+
+
+def _vllm_generate_batch(llm: Any, sampling_params: Any, prompts: List[str]) -> List[str]:
+    """Run one vLLM engine call for a batch of already formatted prompts."""
+    outputs = llm.generate(prompts, sampling_params)
+    return [output.outputs[0].text if output.outputs else "" for output in outputs]
+
+
+@dataclass(frozen=True)
+class VLLMConfig:
+    """vLLM adapter options, read from Settings in one place."""
+    model: str = "meta-llama/Llama-3.1-8B-Instruct"
+    use_server: bool = False
+    server_url: str = "http://localhost:8000"
+    tensor_parallel_size: int = 1
+    gpu_memory_utilization: float = 0.9
+    max_model_len: Optional[int] = None
+    dtype: str = "auto"
+    quantization: Optional[str] = None
+    kv_cache_dtype: Optional[str] = None
+    enable_prefix_caching: bool = True
+    timeout: int = 600
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "VLLMConfig":
+        return cls(
+            model=settings.vllm_model,
+            use_server=settings.vllm_use_server,
+            server_url=settings.vllm_server_url,
+            tensor_parallel_size=settings.vllm_tensor_parallel_size,
+            gpu_memory_utilization=settings.vllm_gpu_memory_utilization,
+            max_model_len=settings.vllm_max_model_len,
+            dtype=settings.vllm_dtype,
+            quantization=settings.vllm_quantization,
+            kv_cache_dtype=settings.vllm_kv_cache_dtype,
+            enable_prefix_caching=settings.vllm_enable_prefix_caching,
+            timeout=settings.vllm_timeout,
+        )
+
+
+# Popular vLLM-compatible models, suggested when no server listing is available.
+_VLLM_POPULAR_MODELS: Tuple[str, ...] = (
+    "meta-llama/Llama-3.1-8B-Instruct",
+    "meta-llama/Llama-3.1-70B-Instruct",
+    "meta-llama/Llama-3.3-70B-Instruct",
+    "Qwen/Qwen2.5-7B-Instruct",
+    "Qwen/Qwen2.5-14B-Instruct",
+    "Qwen/Qwen2.5-32B-Instruct",
+    "Qwen/Qwen2.5-Coder-7B-Instruct",
+    "mistralai/Mistral-7B-Instruct-v0.3",
+    "mistralai/Mixtral-8x7B-Instruct-v0.1",
+    "deepseek-ai/DeepSeek-R1-Distill-Qwen-7B",
+)
+
+
+def _local_vllm_available() -> bool:
+    """Whether vLLM is installed and a CUDA device is visible."""
+    try:
+        import vllm  # noqa: F401
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
 
 
 class VLLMAdapter(BaseLLMAdapter):
@@ -619,6 +1561,12 @@ class VLLMAdapter(BaseLLMAdapter):
     Supports both direct Python API and OpenAI-compatible server mode.
     """
 
+    __slots__ = (
+        "model", "use_server", "server_url", "tensor_parallel_size", "gpu_memory_utilization",
+        "max_model_len", "dtype", "quantization", "kv_cache_dtype", "enable_prefix_caching", "timeout",
+        "_llm", "_model_key", "_sampling_params", "_session",
+    )
+
     def __init__(
         self,
         model: str = "meta-llama/Llama-3.1-8B-Instruct",
@@ -629,6 +1577,8 @@ class VLLMAdapter(BaseLLMAdapter):
         max_model_len: Optional[int] = None,
         dtype: str = "auto",
         quantization: Optional[str] = None,
+        kv_cache_dtype: Optional[str] = None,
+        enable_prefix_caching: bool = True,
         timeout: int = 600,
     ):
         """Initialize vLLM adapter.
@@ -640,8 +1590,10 @@ class VLLMAdapter(BaseLLMAdapter):
             tensor_parallel_size: Number of GPUs for tensor parallelism
             gpu_memory_utilization: Fraction of GPU memory to use (0-1)
             max_model_len: Maximum sequence length (None = model default)
-            dtype: Data type (auto, float16, bfloat16, float32)
+            dtype: Data type (auto, float16, bfloat16, float32); "auto" picks bfloat16 on Ampere+ GPUs
             quantization: Quantization method (awq, gptq, squeezellm, None)
+            kv_cache_dtype: KV cache data type (auto, fp8, fp8_e5m2, ...); None = fp8 on Ada/Hopper GPUs
+            enable_prefix_caching: Reuse KV cache across requests sharing a prompt prefix
             timeout: Request timeout in seconds
         """
         self.model = model
@@ -652,21 +1604,28 @@ class VLLMAdapter(BaseLLMAdapter):
         self.max_model_len = max_model_len
         self.dtype = dtype
         self.quantization = quantization
+        self.kv_cache_dtype = kv_cache_dtype
+        self.enable_prefix_caching = enable_prefix_caching
         self.timeout = timeout
         self._llm = None
+        self._model_key = None
         self._sampling_params = None
+        self._session = _build_session()
 
     def _get_llm(self):
-        """Lazy load the vLLM engine."""
-        if self._llm is None and not self.use_server:
+        """Lazy load the vLLM engine (again, if it has been evicted)."""
+        if not self.use_server and (self._llm is None or self._model_key not in _MODEL_CACHE):
             try:
                 from vllm import LLM, SamplingParams
 
+                dtype, kv_cache_dtype = self._resolve_dtypes()
                 kwargs = {
                     "model": self.model,
                     "tensor_parallel_size": self.tensor_parallel_size,
                     "gpu_memory_utilization": self.gpu_memory_utilization,
-                    "dtype": self.dtype,
+                    "dtype": dtype,
+                    "kv_cache_dtype": kv_cache_dtype,
+                    "enable_prefix_caching": self.enable_prefix_caching,
                     "trust_remote_code": True,
                 }
 
@@ -676,7 +1635,9 @@ class VLLMAdapter(BaseLLMAdapter):
                 if self.quantization:
                     kwargs["quantization"] = self.quantization
 
-                self._llm = LLM(**kwargs)
+                key = ("vllm",) + tuple(sorted(kwargs.items()))
+                self._llm = _load_shared_model(key, lambda: LLM(**kwargs))
+                self._model_key = key
                 self._sampling_params = SamplingParams(
                     temperature=0.7,
                     top_p=0.95,
@@ -689,11 +1650,29 @@ class VLLMAdapter(BaseLLMAdapter):
                 )
         return self._llm
 
-    def _format_messages(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Format prompt with system message if provided."""
-        if system_prompt:
-            return f"{system_prompt}\n\n{prompt}"
-        return prompt
+    def _resolve_dtypes(self) -> tuple:
+        """Pick weight and KV cache dtypes for the local GPU.
+
+        bfloat16 weights on Ampere (SM 8.0) and newer; an FP8 KV cache on
+        Ada (SM 8.9) and Hopper (SM 9.0), which halves KV memory traffic
+        during decode. Explicit settings are passed through unchanged.
+        """
+        capability = (0, 0)
+        try:
+            import torch
+            if torch.cuda.is_available():
+                capability = torch.cuda.get_device_capability()
+        except ImportError:
+            pass
+
+        dtype = self.dtype
+        if dtype == "auto" and capability >= (8, 0):
+            dtype = "bfloat16"
+
+        kv_cache_dtype = self.kv_cache_dtype
+        if kv_cache_dtype is None:
+            kv_cache_dtype = "fp8" if capability >= (8, 9) else "auto"
+        return dtype, kv_cache_dtype
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using vLLM."""
@@ -703,21 +1682,31 @@ class VLLMAdapter(BaseLLMAdapter):
             return self._generate_local(prompt, system_prompt)
 
     def _generate_local(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate using local vLLM Python API."""
-        llm = self._get_llm()
-        full_prompt = self._format_messages(prompt, system_prompt)
+        """Generate using local vLLM Python API.
 
-        outputs = llm.generate([full_prompt], self._sampling_params)
+        Concurrent calls are collected by a batch worker and submitted to
+        the engine together, so vLLM can batch them continuously.
+        """
+        full_prompt = _format_messages(prompt, system_prompt)
+        return self._get_batcher().submit(full_prompt).result()
 
-        if outputs and len(outputs) > 0:
-            return outputs[0].outputs[0].text
-        return ""
+    def _get_batcher(self) -> _BatchWorker:
+        """Get the batch worker feeding the local engine.
+
+        The engine is shared between adapters, and LLM.generate is not
+        thread-safe, so the worker belongs to the engine rather than to
+        this adapter.
+        """
+        llm = self._get_llm()  # Surface load errors in the caller's thread
+        return _shared_batcher(
+            self._model_key, functools.partial(_vllm_generate_batch, llm, self._sampling_params)
+        )
 
     def _generate_server(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate using vLLM OpenAI-compatible server."""
         url = f"{self.server_url}/v1/completions"
 
-        full_prompt = self._format_messages(prompt, system_prompt)
+        full_prompt = _format_messages(prompt, system_prompt)
 
         payload = {
             "model": self.model,
@@ -728,9 +1717,9 @@ class VLLMAdapter(BaseLLMAdapter):
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self._session.post(url, data=_json_dumps(payload), headers=_JSON_HEADERS, timeout=self.timeout)
             response.raise_for_status()
-            result = response.json()
+            result = _json_loads(response.content)
 
             if "choices" in result and len(result["choices"]) > 0:
                 return result["choices"][0].get("text", "")
@@ -747,20 +1736,17 @@ class VLLMAdapter(BaseLLMAdapter):
         In Python API mode, falls back to non-streaming generation.
         """
         if self.use_server:
-            return self._generate_stream_server(prompt, system_prompt)
+            yield from self._generate_stream_server(prompt, system_prompt)
         else:
-            # Python API doesn't support streaming in the same way
-            # Fall back to chunked non-streaming response
-            result = self.generate(prompt, system_prompt)
-            chunk_size = 50
-            for i in range(0, len(result), chunk_size):
-                yield result[i:i + chunk_size]
+            # Python API doesn't support streaming in the same way;
+            # yield the complete response in one piece
+            yield self.generate(prompt, system_prompt)
 
     def _generate_stream_server(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
         """Generate with streaming using vLLM server."""
         url = f"{self.server_url}/v1/completions"
 
-        full_prompt = self._format_messages(prompt, system_prompt)
+        full_prompt = _format_messages(prompt, system_prompt)
 
         payload = {
             "model": self.model,
@@ -772,24 +1758,22 @@ class VLLMAdapter(BaseLLMAdapter):
         }
 
         try:
-            response = requests.post(url, json=payload, stream=True, timeout=self.timeout)
-            response.raise_for_status()
-
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith("data: "):
-                        line = line[6:]  # Remove "data: " prefix
-                        if line.strip() == "[DONE]":
-                            break
-                        try:
-                            data = json.loads(line)
-                            if "choices" in data and len(data["choices"]) > 0:
-                                text = data["choices"][0].get("text", "")
-                                if text:
-                                    yield text
-                        except json.JSONDecodeError:
-                            continue
+            response = self._session.post(
+                url, data=_json_dumps(payload), headers=_JSON_HEADERS, stream=True, timeout=self.timeout
+            )
+            with response:
+                response.raise_for_status()
+
+                loads = _json_loads  # Local lookup in the per-token loop
+                for line in _iter_sse_data(response):
+                    try:
+                        data = loads(line)
+                    except ValueError:
+                        continue
+                    if "choices" in data and len(data["choices"]) > 0:
+                        text = data["choices"][0].get("text", "")
+                        if text:
+                            yield text
         except requests.exceptions.Timeout:
             raise ConnectionError(f"vLLM server request timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
@@ -798,44 +1782,354 @@ class VLLMAdapter(BaseLLMAdapter):
     def is_available(self) -> bool:
         """Check if vLLM is available."""
         if self.use_server:
-            try:
-                response = requests.get(f"{self.server_url}/v1/models", timeout=5)
-                return response.status_code == 200
-            except:
-                return False
-        else:
-            try:
-                import vllm
-                import torch
-                return torch.cuda.is_available()
-            except ImportError:
-                return False
+            key = ("vllm", self.server_url)
+            available = _probe_cache.get(key)
+            if available is None:
+                try:
+                    response = self._session.get(f"{self.server_url}/v1/models", timeout=5)
+                    available = response.status_code == 200
+                except:
+                    available = False
+                _probe_cache.set(key, available)
+            return available
+        available = _availability_cache.get(("vllm-local",))
+        if available is None:
+            available = _local_vllm_available()
+            _availability_cache.set(("vllm-local",), available)
+        return available
 
     def get_models(self) -> List[str]:
         """Get suggested vLLM-compatible models."""
         if self.use_server:
+            key = ("vllm", self.server_url)
+            models = _models_cache.get(key)
+            if models is not None:
+                return list(models)
             try:
-                response = requests.get(f"{self.server_url}/v1/models", timeout=5)
+                response = self._session.get(f"{self.server_url}/v1/models", timeout=5)
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json_loads(response.content)
                     if "data" in data:
-                        return [m.get("id", "") for m in data["data"]]
+                        # Skip entries without an id rather than listing blanks
+                        models = [m["id"] for m in data["data"] if m.get("id")]
+                        _models_cache.set(key, tuple(models))
+                        return models
             except:
                 pass
 
-        # Return popular vLLM-compatible models
-        return [
-            "meta-llama/Llama-3.1-8B-Instruct",
-            "meta-llama/Llama-3.1-70B-Instruct",
-            "meta-llama/Llama-3.3-70B-Instruct",
-            "Qwen/Qwen2.5-7B-Instruct",
-            "Qwen/Qwen2.5-14B-Instruct",
-            "Qwen/Qwen2.5-32B-Instruct",
-            "Qwen/Qwen2.5-Coder-7B-Instruct",
-            "mistralai/Mistral-7B-Instruct-v0.3",
-            "mistralai/Mixtral-8x7B-Instruct-v0.1",
-            "deepseek-ai/DeepSeek-R1-Distill-Qwen-7B",
-        ]
+        return list(_VLLM_POPULAR_MODELS)
+
+    def warmup(self) -> None:
+        """Open a pooled connection to the vLLM server (server mode)."""
+        if not self.use_server:
+            return
+        try:
+            self._session.get(f"{self.server_url}/health", timeout=5)
+        except requests.exceptions.RequestException:
+            pass
+
+    def close(self) -> None:
+        """Close the pooled HTTP session.
+
+        The engine and its batch worker are shared, so they stay loaded.
+        """
+        self._session.close()
+
+
+class CachingAdapter(BaseLLMAdapter):
+    """Response cache wrapped around any other adapter.
+
+    ``generate`` is a pure function of (model, system prompt, prompt) for a
+    fixed adapter, so identical requests are answered from an in-memory LRU
+    instead of hitting the LLM again. With a ResponseStore, entries are also
+    written to disk and memory misses fall back to it, so responses survive
+    restarts. Availability and model listing are passed straight through to
+    the wrapped adapter.
+    """
+
+    __slots__ = ("inner", "max_entries", "store", "_entries", "_lock", "_hits", "_misses")
+
+    def __init__(self, inner: BaseLLMAdapter, max_entries: int = 256, store: Optional[ResponseStore] = None):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _cache_key(self, prompt: str, system_prompt: Optional[str]) -> bytes:
+        """Hash the inputs that determine a response."""
+        return _request_key(self.inner, prompt, system_prompt)
+
+    def _lookup(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return cached
+
+        cached = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if cached is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        self._remember(key, cached)
+        return cached
+
+    def _remember(self, key: bytes, response: str) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, key: bytes, response: str) -> None:
+        self._remember(key, response)
+        if self.store is not None:
+            model = getattr(self.inner, 'model', None) or getattr(self.inner, 'model_id', '')
+            self.store.put(key, response, model=model)
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Return a cached response, or generate and remember it."""
+        key = self._cache_key(prompt, system_prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self.inner.generate(prompt, system_prompt)
+        if response:
+            self._store(key, response)
+        return response
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        """Replay a cached response, or stream from the inner adapter and cache the result."""
+        key = self._cache_key(prompt, system_prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        for chunk in self.inner.generate_stream(prompt, system_prompt):
+            parts.append(chunk)
+            yield chunk
+        response = "".join(parts)
+        if response:
+            self._store(key, response)
+
+    def is_available(self) -> bool:
+        """Check if the wrapped LLM is available."""
+        return self.inner.is_available()
+
+    def get_models(self) -> List[str]:
+        """Get models from the wrapped adapter."""
+        return self.inner.get_models()
+
+    def warmup(self) -> None:
+        """Warm up the wrapped adapter."""
+        self.inner.warmup()
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.inner.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters and current size."""
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'size': len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop all cached responses, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+class _TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens/min."""
+
+    __slots__ = ("capacity", "_fill_rate", "_tokens", "_updated", "_lock")
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self._fill_rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._fill_rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self._fill_rate
+            time.sleep(wait)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens without waiting; the balance may go negative."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class RateLimitedAdapter(BaseLLMAdapter):
+    """Pace requests to another adapter under requests/min and tokens/min ceilings.
+
+    Concurrent callers wait on token buckets instead of tripping the
+    provider's 429 responses and retry backoff. Prompt tokens are charged
+    before each request and completion tokens after it. `max_concurrent`
+    additionally caps how many requests are in flight at once.
+    """
+
+    __slots__ = ("inner", "_rpm", "_tpm", "_slots")
+
+    def __init__(
+        self,
+        inner: BaseLLMAdapter,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        self.inner = inner
+        self._rpm = _TokenBucket(rpm) if rpm else None
+        self._tpm = _TokenBucket(tpm) if tpm else None
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def _before(self, prompt: str, system_prompt: Optional[str]) -> None:
+        if self._rpm is not None:
+            self._rpm.acquire()
+        if self._tpm is not None:
+            tokens = self.inner.count_tokens(prompt)
+            if system_prompt:
+                tokens += self.inner.count_tokens(system_prompt)
+            self._tpm.acquire(tokens)
+
+    def _after(self, response: str) -> None:
+        if self._tpm is not None:
+            self._tpm.consume(self.inner.count_tokens(response))
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate text once the rate limits allow it."""
+        self._before(prompt, system_prompt)
+        if self._slots is None:
+            response = self.inner.generate(prompt, system_prompt)
+        else:
+            with self._slots:
+                response = self.inner.generate(prompt, system_prompt)
+        self._after(response)
+        return response
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        """Stream text once the rate limits allow it."""
+        self._before(prompt, system_prompt)
+        if self._slots is not None:
+            self._slots.acquire()
+        produced = 0
+        try:
+            for chunk in self.inner.generate_stream(prompt, system_prompt):
+                produced += len(chunk)
+                yield chunk
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+            if self._tpm is not None:
+                self._tpm.consume(produced // 4)
+
+    def is_available(self) -> bool:
+        """Check if the wrapped LLM is available."""
+        return self.inner.is_available()
+
+    def get_models(self) -> List[str]:
+        """Get models from the wrapped adapter."""
+        return self.inner.get_models()
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the wrapped adapter's tokenizer."""
+        return self.inner.count_tokens(text)
+
+    def warmup(self) -> None:
+        """Warm up the wrapped adapter."""
+        self.inner.warmup()
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.inner.close()
+
+
+def _build_ollama(settings: Settings) -> BaseLLMAdapter:
+    return OllamaAdapter(
+        base_url=settings.ollama_base_url,
+        model=settings.ollama_model,
+        timeout=settings.ollama_timeout
+    )
+
+
+def _build_huggingface(settings: Settings) -> BaseLLMAdapter:
+    return HuggingFaceAdapter(
+        model_id=settings.hf_model_id,
+        use_api=settings.hf_use_api,
+        api_token=settings.hf_api_token,
+        quantization=settings.hf_quantization
+    )
+
+
+def _build_openai(settings: Settings) -> BaseLLMAdapter:
+    return OpenAIAdapter(api_key=settings.openai_api_key, model=settings.openai_model)
+
+
+def _build_groq(settings: Settings) -> BaseLLMAdapter:
+    return GroqAdapter(api_key=settings.groq_api_key, model=settings.groq_model)
+
+
+def _build_anthropic(settings: Settings) -> BaseLLMAdapter:
+    return AnthropicAdapter(api_key=settings.anthropic_api_key, model=settings.anthropic_model)
+
+
+def _build_vllm(settings: Settings) -> BaseLLMAdapter:
+    return VLLMAdapter(**asdict(VLLMConfig.from_settings(settings)))
+
+
+def _wrap_adapter(adapter: BaseLLMAdapter, settings: Settings) -> BaseLLMAdapter:
+    """Apply the configured rate limits and response cache around `adapter`."""
+    rpm = settings.llm_max_rpm
+    tpm = settings.llm_max_tpm
+    max_concurrent = settings.llm_max_concurrent
+    if rpm or tpm or max_concurrent:
+        adapter = RateLimitedAdapter(adapter, rpm=rpm, tpm=tpm, max_concurrent=max_concurrent)
+
+    if settings.llm_cache_enabled:
+        store = get_response_store() if settings.llm_cache_persist else None
+        adapter = CachingAdapter(
+            adapter,
+            max_entries=settings.llm_cache_size,
+            store=store
+        )
+    return adapter
+
+
+# Adapter factories by provider name (LLMProvider values). Register new
+# providers here; LLMAdapter dispatches through this mapping.
+PROVIDER_REGISTRY: Dict[str, Callable[[Settings], BaseLLMAdapter]] = {
+    LLMProvider.OLLAMA.value: _build_ollama,
+    LLMProvider.HUGGINGFACE.value: _build_huggingface,
+    LLMProvider.OPENAI.value: _build_openai,
+    LLMProvider.GROQ.value: _build_groq,
+    LLMProvider.ANTHROPIC.value: _build_anthropic,
+    LLMProvider.VLLM.value: _build_vllm,
+}
 
 
 class LLMAdapter:
@@ -844,64 +2138,97 @@ class LLMAdapter:
     Factory pattern for creating the appropriate adapter.
     """
 
-    def __init__(self, settings: Optional[Settings] = None):
+    def __init__(self, settings: Optional[Settings] = None, warmup: bool = False):
+        """
+        Args:
+            settings: Settings to build the provider adapter from (default: global settings)
+            warmup: Open the provider connection in the background right away, so
+                the first request skips the handshake. Leave off for adapters that
+                only probe availability.
+        """
         self.settings = settings or get_settings()
         self._adapter: Optional[BaseLLMAdapter] = None
         self._initialize_adapter()
+        if warmup:
+            self.warmup()
 
     def _initialize_adapter(self) -> None:
         """Initialize the appropriate adapter based on settings."""
         provider = self.settings.llm_provider
 
-        if provider == LLMProvider.OLLAMA.value:
-            self._adapter = OllamaAdapter(
-                base_url=self.settings.ollama_base_url,
-                model=self.settings.ollama_model,
-                timeout=getattr(self.settings, 'ollama_timeout', 600)
-            )
-        elif provider == LLMProvider.HUGGINGFACE.value:
-            self._adapter = HuggingFaceAdapter(
-                model_id=self.settings.hf_model_id,
-                use_api=self.settings.hf_use_api,
-                api_token=self.settings.hf_api_token
-            )
-        elif provider == LLMProvider.OPENAI.value:
-            self._adapter = OpenAIAdapter(
-                api_key=self.settings.openai_api_key,
-                model=self.settings.openai_model
-            )
-        elif provider == LLMProvider.GROQ.value:
-            self._adapter = GroqAdapter(
-                api_key=self.settings.groq_api_key,
-                model=self.settings.groq_model
-            )
-        elif provider == LLMProvider.ANTHROPIC.value:
-            self._adapter = AnthropicAdapter(
-                api_key=self.settings.anthropic_api_key,
-                model=self.settings.anthropic_model
-            )
-        elif provider == LLMProvider.VLLM.value:
-            self._adapter = VLLMAdapter(
-                model=getattr(self.settings, 'vllm_model', 'meta-llama/Llama-3.1-8B-Instruct'),
-                use_server=getattr(self.settings, 'vllm_use_server', False),
-                server_url=getattr(self.settings, 'vllm_server_url', 'http://localhost:8000'),
-                tensor_parallel_size=getattr(self.settings, 'vllm_tensor_parallel_size', 1),
-                gpu_memory_utilization=getattr(self.settings, 'vllm_gpu_memory_utilization', 0.9),
-                max_model_len=getattr(self.settings, 'vllm_max_model_len', None),
-                dtype=getattr(self.settings, 'vllm_dtype', 'auto'),
-                quantization=getattr(self.settings, 'vllm_quantization', None),
-                timeout=getattr(self.settings, 'vllm_timeout', 600)
-            )
-        else:
+        builder = PROVIDER_REGISTRY.get(provider)
+        if builder is None:
             raise ValueError(f"Unknown LLM provider: {provider}")
+        self._adapter = _wrap_adapter(builder(self.settings), self.settings)
 
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate text using the configured provider."""
-        return self._adapter.generate(prompt, system_prompt)
+    def warmup(self) -> None:
+        """Connect to the provider in a background thread (best effort)."""
+        threading.Thread(target=self._adapter.warmup, name="llm-warmup", daemon=True).start()
 
-    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Generator[str, None, None]:
-        """Generate text with streaming."""
-        return self._adapter.generate_stream(prompt, system_prompt)
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, no_cache: bool = False) -> str:
+        """Generate text using the configured provider.
+
+        Concurrent calls with the same prompt share a single LLM request.
+        Pass ``no_cache=True`` to always get a fresh response: the response
+        cache and request coalescing are both skipped.
+        """
+        if no_cache:
+            adapter = self._adapter
+            if isinstance(adapter, CachingAdapter):
+                adapter = adapter.inner
+            return adapter.generate(prompt, system_prompt)
+        return self._adapter.coalesced_generate(prompt, system_prompt)
+
+    def generate_stream(
+        self, prompt: str, system_prompt: Optional[str] = None, coalesce_ms: int = 0
+    ) -> Generator[str, None, None]:
+        """Generate text with streaming.
+
+        With ``coalesce_ms`` > 0, token deltas are batched (up to that many
+        milliseconds or 8 deltas) so consumers redraw less often.
+        """
+        stream = self._adapter.generate_stream(prompt, system_prompt)
+        if coalesce_ms > 0:
+            return _coalesce_chunks(stream, coalesce_ms / 1000)
+        return stream
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate text without blocking the event loop."""
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
+    def agenerate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """Stream text without blocking the event loop."""
+        return self._adapter.agenerate_stream(prompt, system_prompt)
+
+    async def agenerate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 8,
+    ) -> List[Any]:
+        """Generate responses for independent prompts with bounded concurrency.
+
+        At most `max_concurrency` requests are in flight at once. Results are in
+        prompt order; a failed prompt yields its exception instead of aborting
+        the batch. Configured rate limits (llm_max_rpm/llm_max_tpm) still apply,
+        since every request goes through the wrapped adapter.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(prompt: str) -> str:
+            async with semaphore:
+                return await self.agenerate(prompt, system_prompt)
+
+        return await asyncio.gather(*(run(p) for p in prompts), return_exceptions=True)
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 8,
+    ) -> List[Any]:
+        """Synchronous wrapper around agenerate_batch for non-async callers."""
+        return asyncio.run(self.agenerate_batch(prompts, system_prompt, max_concurrency))
 
     def is_available(self) -> bool:
         """Check if the configured LLM is available."""
@@ -918,13 +2245,47 @@ class LLMAdapter:
     def refresh(self) -> None:
         """Refresh the adapter with current settings."""
         self.settings = get_settings()
+        clear_probe_caches()
+        clear_code_adapter_cache()
         self._initialize_adapter()
 
+    def close(self) -> None:
+        """Release the provider adapter's connections."""
+        self._adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
 
 # Factory function
-def get_llm_adapter(settings: Optional[Settings] = None) -> LLMAdapter:
+def get_llm_adapter(settings: Optional[Settings] = None, warmup: bool = False) -> LLMAdapter:
     """Get an LLM adapter instance."""
-    return LLMAdapter(settings)
+    return LLMAdapter(settings, warmup=warmup)
+
+
+class CodeLLMAdapter(LLMAdapter):
+    """LLMAdapter bound to a dedicated code model (e.g. CodeLlama on Ollama)."""
+
+    def __init__(self, settings: Settings, code_adapter: BaseLLMAdapter):
+        self.settings = settings
+        self._adapter = code_adapter
+
+
+# Ollama code-model adapters that passed their availability probe, wrapped
+# with the configured rate limits and response cache, keyed by the settings
+# they were built from. Only positive results are cached so a model pulled
+# later is picked up on the next call.
+_code_adapter_cache: Dict[tuple, BaseLLMAdapter] = {}
+_code_adapter_lock = threading.Lock()
+
+
+def clear_code_adapter_cache() -> None:
+    """Forget memoized code-model adapters (e.g. after settings change)."""
+    with _code_adapter_lock:
+        _code_adapter_cache.clear()
 
 
 def get_code_llm_adapter(settings: Optional[Settings] = None) -> LLMAdapter:
@@ -936,24 +2297,32 @@ def get_code_llm_adapter(settings: Optional[Settings] = None) -> LLMAdapter:
 
     # Only use code model for Ollama provider with the setting enabled
     if (settings.llm_provider == LLMProvider.OLLAMA.value and
-        getattr(settings, 'use_code_model_for_scripts', True)):
+        settings.use_code_model_for_scripts):
+
+        code_model = settings.ollama_code_model
+        timeout = settings.ollama_timeout
+        key = (
+            settings.ollama_base_url, code_model, timeout,
+            settings.llm_max_rpm, settings.llm_max_tpm, settings.llm_max_concurrent,
+            settings.llm_cache_enabled, settings.llm_cache_persist, settings.llm_cache_size,
+        )
 
-        code_model = getattr(settings, 'ollama_code_model', 'codellama:7b')
+        with _code_adapter_lock:
+            adapter = _code_adapter_cache.get(key)
+        if adapter is not None:
+            return CodeLLMAdapter(settings, adapter)
 
         # Check if code model is available
         try:
             adapter = OllamaAdapter(
                 base_url=settings.ollama_base_url,
                 model=code_model,
-                timeout=getattr(settings, 'ollama_timeout', 600)
+                timeout=timeout
             )
             if adapter.is_available():
-                # Return a wrapper that uses the code model
-                class CodeLLMAdapter(LLMAdapter):
-                    def __init__(self, settings, code_adapter):
-                        self.settings = settings
-                        self._adapter = code_adapter
-
+                adapter = _wrap_adapter(adapter, settings)
+                with _code_adapter_lock:
+                    adapter = _code_adapter_cache.setdefault(key, adapter)
                 return CodeLLMAdapter(settings, adapter)
         except Exception:
             pass  # Fall back to main adapter
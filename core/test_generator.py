@@ -1,8 +1,13 @@
 """
 Test Generation Engine - Core logic for generating test cases.
 """
+import os
 import json
 import re
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Generator, Callable
 from dataclasses import dataclass
@@ -14,6 +19,179 @@ from models.requirement import Requirement
 from templates.prompts import PromptTemplates
 from config.settings import get_settings
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:  # orjson is optional; its errors subclass json.JSONDecodeError
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+# Patterns used to pull structured content out of free-form LLM responses
+_JSON_FENCED = re.compile(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```')
+_GHERKIN_TOKEN = re.compile(r'Feature:|Scenario(?:\s+Outline)?:')
+_FEATURE_NAME = re.compile(r'Feature:\s*(.+)')
+_PY_CODE_BLOCK = re.compile(r'```(?:python|py)?\s*\n(.*?)```', re.DOTALL | re.IGNORECASE)
+_JS_CODE_BLOCK = re.compile(r'```(?:javascript|js|typescript|ts)?\s*\n(.*?)```', re.DOTALL | re.IGNORECASE)
+
+_JSON_DECODER = json.JSONDecoder()
+# Key of the test-case array in manual-test responses, located by _TestCaseStream
+_TEST_CASES_KEY = '"test_cases"'
+
+# Bounds on LLM output handed to the JSON decoder. Real responses are a few
+# KB and nest about five levels deep; past that the text is degenerate, and
+# the recursive decoder would burn CPU on it or raise RecursionError.
+_MAX_JSON_CHARS = 2 * 1024 * 1024
+_MAX_JSON_DEPTH = 64
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_JSON_BRACKET = re.compile(r'[\[\]{}]')
+
+# Requirement text sent per batched manual-test call (three documents at the
+# 3000-character cap the single-document prompt applies)
+_BATCH_REQUIREMENTS_CHARS = 9000
+
+
+class _FilenameTable(dict):
+    """str.translate table mapping anything but [a-zA-Z0-9_] to '_'."""
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        value = char if char == '_' or (char.isascii() and char.isalnum()) else '_'
+        self[codepoint] = value
+        return value
+
+
+_FILENAME_TABLE = _FilenameTable()
+
+
+# LLMLingua-2 model used to shorten requirements text before automation prompts
+_COMPRESSOR_MODEL = "microsoft/llmlingua-2-bert-base-multilingual-cased-meetingbank"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_prompt_compressor():
+    """Load the LLMLingua-2 compressor once, or return None if unavailable."""
+    try:
+        from llmlingua import PromptCompressor
+    except ImportError:
+        logger.warning("llmlingua is not installed; prompt compression is disabled")
+        return None
+    return PromptCompressor(_COMPRESSOR_MODEL, use_llmlingua2=True, device_map="cpu")
+
+
+@functools.lru_cache(maxsize=64)
+def _compress_text(text: str, rate: float = 0.55) -> str:
+    """Compress prose with LLMLingua-2, caching results (compression is slow)."""
+    compressor = _get_prompt_compressor()
+    if compressor is None or not text.strip():
+        return text
+    try:
+        return compressor.compress_prompt(text, rate=rate)['compressed_prompt']
+    except Exception as e:
+        logger.warning("Prompt compression failed: %s", e)
+        return text
+
+
+class _TestCaseStream:
+    """Count test-case objects in a streamed manual-test response as they complete.
+
+    Used for progress only: once the stream ends the full response is still
+    parsed by _parse_manual_tests, so a malformed stream costs nothing but
+    progress updates.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        # Text not yet scanned: before the array, a suffix that may hold a key
+        # split across chunks; inside it, everything from the next unfinished object
+        self._tail = ""
+        self._in_array = False
+        self._done = False
+        self.count = 0
+
+    @property
+    def text(self) -> str:
+        """The response received so far."""
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> int:
+        """Append a stream chunk and return how many test cases it completed."""
+        self._chunks.append(chunk)
+        if self._done:
+            return 0
+        tail = self._tail + chunk
+        if not self._in_array:
+            key = tail.find(_TEST_CASES_KEY)
+            bracket = tail.find('[', key) if key != -1 else -1
+            if bracket == -1:
+                self._tail = tail[key:] if key != -1 else tail[-len(_TEST_CASES_KEY):]
+                return 0
+            self._in_array = True
+            tail = tail[bracket + 1:]
+        elif '}' not in chunk:
+            # Nothing can have closed since the last attempt
+            self._tail = tail
+            return 0
+
+        completed = 0
+        pos = 0
+        while True:
+            start = tail.find('{', pos)
+            if tail.find(']', pos, len(tail) if start == -1 else start) != -1:
+                self._done = True  # The array has ended
+                break
+            if start == -1:
+                pos = len(tail)
+                break
+            try:
+                _, pos = _JSON_DECODER.raw_decode(tail, start)
+            except json.JSONDecodeError:
+                pos = start  # Object still streaming in
+                break
+            completed += 1
+        self._tail = tail[pos:]
+        self.count += completed
+        return completed
+
+
+def _within_json_depth(text: str, limit: int = _MAX_JSON_DEPTH) -> bool:
+    """Check that brackets outside string literals nest at most `limit` deep."""
+    depth = 0
+    for bracket in _JSON_BRACKET.finditer(_JSON_STRING.sub('""', text)):
+        if bracket.group() in '{[':
+            depth += 1
+            if depth > limit:
+                return False
+        elif depth:
+            depth -= 1
+    return True
+
+
+def _pack_batches(requirements: List[Requirement], max_chars: int) -> List[List[int]]:
+    """Group requirement indexes, in order, so each group's text fits in `max_chars`.
+
+    Sizes count at most the 3000 characters the prompt keeps per document; a
+    document over the budget still gets a group of its own.
+    """
+    batches: List[List[int]] = []
+    used = 0
+    for i, requirement in enumerate(requirements):
+        size = min(len(requirement.content), 3000)
+        if not batches or used + size > max_chars:
+            batches.append([])
+            used = 0
+        batches[-1].append(i)
+        used += size
+    return batches
+
 
 @dataclass
 class GenerationProgress:
@@ -33,10 +211,52 @@ class TestGenerator:
     """
 
     def __init__(self, llm_adapter: Optional[LLMAdapter] = None):
-        self.llm = llm_adapter or get_llm_adapter()
-        self.code_llm = get_code_llm_adapter()  # Specialized for code generation
+        # Generation follows shortly, so warm up the connection meanwhile
+        self.llm = llm_adapter or get_llm_adapter(warmup=True)
+        self._code_llm: Optional[LLMAdapter] = None
+        self._init_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
         self.settings = get_settings()
 
+    @property
+    def code_llm(self) -> LLMAdapter:
+        """Adapter specialized for code generation, resolved on first use.
+
+        Picking it probes the Ollama server for the code model, which manual-only
+        runs never need.
+        """
+        if self._code_llm is None:
+            with self._init_lock:
+                if self._code_llm is None:
+                    self._code_llm = get_code_llm_adapter()
+        return self._code_llm
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """Worker pool for the automation stages, shared across generate_test_suite calls.
+
+        Created on first use, so manual-only runs start no threads.
+        """
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=max(3, os.cpu_count() or 4), thread_name_prefix="automation"
+                    )
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the automation worker pool, cancelling stages not yet started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
     def generate_test_suite(
         self,
         requirement: Requirement,
@@ -71,13 +291,7 @@ class TestGenerator:
                 progress_callback(GenerationProgress(stage, progress, message))
 
         # Initialize test suite
-        suite = TestSuite(
-            name=requirement.get_display_name(),
-            description=f"Test suite generated from {requirement.filename}",
-            client_name=client_context.name if client_context else "",
-            requirement_source=requirement.filename,
-            generated_at=datetime.now().isoformat()
-        )
+        suite = self._new_suite(requirement, client_context)
 
         # Get client context text
         context_text = client_context.get_context_text() if client_context else ""
@@ -112,7 +326,10 @@ class TestGenerator:
                 context_text,
                 include_edge_cases,
                 include_negative,
-                include_boundary
+                include_boundary,
+                on_test_parsed=(lambda n: step_progress(
+                    "manual", f"🧪 Received test case {n} from LLM...", min(0.25 + 0.02 * n, 0.85)
+                )) if progress_callback else None
             )
             suite.manual_tests = manual_tests
 
@@ -124,72 +341,67 @@ class TestGenerator:
             current_step = 1
 
             # Prepare manual tests summary for automation generation
-            manual_tests_json = json.dumps([t.to_dict() for t in manual_tests[:10]], indent=2)
+            # Compact JSON: the model doesn't need pretty-printing, and the prompt
+            # templates cap input by characters, so more tests fit in the budget
+            manual_tests_json = _json_dumps([t.to_dict() for t in manual_tests[:10]])
             requirements_summary = requirement.content[:2000]
             tests_count_info = f"(based on {len(manual_tests)} manual tests)"
 
-            # ── Stage 2: Generate Gherkin (if requested) ──
+            # ── Stages 2-4: Gherkin / Selenium / Playwright (if requested) ──
+            # Each stage is an independent LLM call on the same inputs, so they
+            # run concurrently. Progress is still reported from this thread only,
+            # as the callback may touch UI state that is not thread-safe.
+            stages = []
             if generate_gherkin:
                 step_progress("gherkin", f"📝 Preparing Gherkin BDD feature file generation {tests_count_info}...", 0.0)
 
                 step_progress("gherkin", f"🤖 Sending to LLM for Gherkin conversion — converting manual tests to Given/When/Then format...", 0.2)
 
-                gherkin_scripts = self._generate_gherkin(
-                    manual_tests_json,
-                    requirements_summary,
-                    context_text
-                )
-                suite.gherkin_scripts = gherkin_scripts
-
-                if gherkin_scripts:
-                    total_scenarios = sum(s.scenario_count for s in gherkin_scripts)
-                    step_progress("gherkin", f"✅ Generated {len(gherkin_scripts)} Gherkin feature file(s) with {total_scenarios} scenarios", 0.95)
-                else:
-                    step_progress("gherkin", "⚠️ Gherkin generation returned empty — LLM response could not be parsed into feature files", 0.95)
+                stages.append(("gherkin", self._generate_gherkin))
 
-                current_step += 1
-
-            # ── Stage 3: Generate Selenium (if requested) ──
             if generate_selenium:
-                code_model_name = getattr(self.settings, 'ollama_code_model', 'codellama:7b')
+                code_model_name = self.settings.ollama_code_model
                 step_progress("selenium", f"🐍 Preparing Selenium Python script generation {tests_count_info}...", 0.0)
 
                 step_progress("selenium", f"🤖 Sending to CodeLlama ({code_model_name}) — generating pytest + Selenium scripts with Page Object Model...", 0.2)
 
-                selenium_scripts = self._generate_selenium(
-                    manual_tests_json,
-                    requirements_summary,
-                    context_text
-                )
-                suite.selenium_scripts = selenium_scripts
-
-                if selenium_scripts:
-                    step_progress("selenium", f"✅ Generated {len(selenium_scripts)} Selenium Python test script(s)", 0.95)
-                else:
-                    step_progress("selenium", "⚠️ Selenium generation returned empty — CodeLlama response could not be parsed", 0.95)
-
-                current_step += 1
+                stages.append(("selenium", self._generate_selenium))
 
-            # ── Stage 4: Generate Playwright (if requested) ──
             if generate_playwright:
-                code_model_name = getattr(self.settings, 'ollama_code_model', 'codellama:7b')
+                code_model_name = self.settings.ollama_code_model
                 step_progress("playwright", f"🎭 Preparing Playwright JavaScript test generation {tests_count_info}...", 0.0)
 
                 step_progress("playwright", f"🤖 Sending to CodeLlama ({code_model_name}) — generating @playwright/test specs with async/await...", 0.2)
 
-                playwright_scripts = self._generate_playwright(
-                    manual_tests_json,
-                    requirements_summary,
-                    context_text
-                )
-                suite.playwright_scripts = playwright_scripts
+                stages.append(("playwright", self._generate_playwright))
 
-                if playwright_scripts:
-                    step_progress("playwright", f"✅ Generated {len(playwright_scripts)} Playwright test spec(s)", 0.95)
-                else:
-                    step_progress("playwright", "⚠️ Playwright generation returned empty — CodeLlama response could not be parsed", 0.95)
+            # Selenium and Playwright go to the same code model with the same
+            # inputs; when both are wanted, ask for them in a single request.
+            if generate_selenium and generate_playwright:
+                stages = [stage for stage in stages if stage[0] == "gherkin"]
+                stages.append((
+                    "code",
+                    lambda *args: self._generate_code_scripts(*args, targets=("selenium", "playwright"))
+                ))
 
-                current_step += 1
+            if stages:
+                futures = {}
+                try:
+                    for stage, generate in stages:
+                        future = self.pool.submit(generate, manual_tests_json, requirements_summary, context_text)
+                        futures[future] = stage
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if futures[future] != "code":
+                            result = {futures[future]: result}
+
+                        for stage, scripts in result.items():
+                            self._report_stage_result(suite, stage, scripts, step_progress)
+                            current_step += 1
+                finally:
+                    # On failure, don't start this run's stages that haven't begun yet
+                    for future in futures:
+                        future.cancel()
 
             # ── Final Summary ──
             total_items = len(suite.manual_tests)
@@ -212,15 +424,106 @@ class TestGenerator:
 
         return suite
 
+    def generate_test_suites_batch(
+        self,
+        requirements: List[Requirement],
+        client_context: Optional[ClientContext] = None,
+        include_edge_cases: bool = True,
+        include_negative: bool = True,
+        include_boundary: bool = True,
+        max_batch_chars: int = _BATCH_REQUIREMENTS_CHARS
+    ) -> List[TestSuite]:
+        """
+        Generate manual test suites for several requirement documents.
+
+        Documents are packed into as few LLM calls as fit `max_batch_chars` of
+        requirement text, each call answering per document. Any document the
+        batched response has no tests for is regenerated on its own.
+
+        Args:
+            requirements: Parsed requirement documents
+            client_context: Optional client context for customization
+            include_edge_cases: Include edge case tests
+            include_negative: Include negative tests
+            include_boundary: Include boundary tests
+            max_batch_chars: Requirement text budget per LLM call
+
+        Returns:
+            One TestSuite per requirement, in input order
+        """
+        context_text = client_context.get_context_text() if client_context else ""
+        options = (include_edge_cases, include_negative, include_boundary)
+        suites = [self._new_suite(requirement, client_context) for requirement in requirements]
+
+        for batch in _pack_batches(requirements, max_batch_chars):
+            results = {}
+            if len(batch) > 1:
+                prompt = PromptTemplates.get_batch_manual_test_prompt(
+                    [requirements[i].content for i in batch], context_text, *options
+                )
+                response = self.llm.generate(prompt, PromptTemplates.SYSTEM_PROMPT)
+                results = self._parse_batch_manual_tests(response)
+
+            for req_id, index in enumerate(batch, 1):
+                tests = results.get(req_id)
+                if not tests:
+                    tests = self._generate_manual_tests(requirements[index].content, context_text, *options)
+                suites[index].manual_tests = tests
+
+        return suites
+
+    def _new_suite(self, requirement: Requirement, client_context: Optional[ClientContext]) -> TestSuite:
+        """Create an empty test suite for a requirement document."""
+        return TestSuite(
+            name=requirement.get_display_name(),
+            description=f"Test suite generated from {requirement.filename}",
+            client_name=client_context.name if client_context else "",
+            requirement_source=requirement.filename,
+            generated_at=datetime.now().isoformat()
+        )
+
+    def _report_stage_result(
+        self,
+        suite: TestSuite,
+        stage: str,
+        scripts: List[AutomationScript],
+        step_progress: Callable[[str, str, float], None]
+    ) -> None:
+        """Store one automation stage's scripts on the suite and report the outcome."""
+        if stage == "gherkin":
+            suite.gherkin_scripts = scripts
+            if scripts:
+                total_scenarios = sum(s.scenario_count for s in scripts)
+                step_progress("gherkin", f"✅ Generated {len(scripts)} Gherkin feature file(s) with {total_scenarios} scenarios", 0.95)
+            else:
+                step_progress("gherkin", "⚠️ Gherkin generation returned empty — LLM response could not be parsed into feature files", 0.95)
+        elif stage == "selenium":
+            suite.selenium_scripts = scripts
+            if scripts:
+                step_progress("selenium", f"✅ Generated {len(scripts)} Selenium Python test script(s)", 0.95)
+            else:
+                step_progress("selenium", "⚠️ Selenium generation returned empty — CodeLlama response could not be parsed", 0.95)
+        else:
+            suite.playwright_scripts = scripts
+            if scripts:
+                step_progress("playwright", f"✅ Generated {len(scripts)} Playwright test spec(s)", 0.95)
+            else:
+                step_progress("playwright", "⚠️ Playwright generation returned empty — CodeLlama response could not be parsed", 0.95)
+
     def _generate_manual_tests(
         self,
         requirements: str,
         client_context: str,
         include_edge_cases: bool,
         include_negative: bool,
-        include_boundary: bool
+        include_boundary: bool,
+        on_test_parsed: Optional[Callable[[int], None]] = None
     ) -> List[ManualTestCase]:
-        """Generate manual test cases from requirements."""
+        """Generate manual test cases from requirements.
+
+        With `on_test_parsed`, the response is streamed and the callback gets
+        the running count each time another test case object completes.
+        """
         prompt = PromptTemplates.get_manual_test_prompt(
             requirements=requirements,
             client_context=client_context,
@@ -229,8 +532,15 @@ class TestGenerator:
             include_boundary=include_boundary
         )
 
-        response = self.llm.generate(prompt, PromptTemplates.SYSTEM_PROMPT)
-        return self._parse_manual_tests(response)
+        if on_test_parsed is None:
+            response = self.llm.generate(prompt, PromptTemplates.SYSTEM_PROMPT)
+            return self._parse_manual_tests(response)
+
+        tracker = _TestCaseStream()
+        for chunk in self.llm.generate_stream(prompt, PromptTemplates.SYSTEM_PROMPT):
+            if tracker.feed(chunk):
+                on_test_parsed(tracker.count)
+        return self._parse_manual_tests(tracker.text)
 
     def _generate_gherkin(
         self,
@@ -239,6 +549,10 @@ class TestGenerator:
         client_context: str
     ) -> List[AutomationScript]:
         """Generate Gherkin feature files."""
+        if self.settings.enable_prompt_compression:
+            # Only the Gherkin prompt includes the summary, so it is compressed
+            # here, on the stage's worker. The test JSON must stay exact.
+            requirements_summary = _compress_text(requirements_summary)
         prompt = PromptTemplates.get_gherkin_prompt(
             manual_tests=manual_tests,
             requirements_summary=requirements_summary,
@@ -282,6 +596,24 @@ class TestGenerator:
         response = self.code_llm.generate(prompt, PromptTemplates.SYSTEM_PROMPT)
         return self._parse_automation_scripts(response, "playwright")
 
+    def _generate_code_scripts(
+        self,
+        manual_tests: str,
+        requirements_summary: str,
+        client_context: str,
+        targets: tuple = ("selenium", "playwright")
+    ) -> Dict[str, List[AutomationScript]]:
+        """Generate several automation script types with one code-model request."""
+        prompt = PromptTemplates.get_combined_automation_prompt(
+            manual_tests=manual_tests,
+            requirements_summary=requirements_summary,
+            client_context=client_context,
+            targets=targets
+        )
+
+        response = self.code_llm.generate(prompt, PromptTemplates.SYSTEM_PROMPT)
+        return self._parse_combined_scripts(response, targets)
+
     def _parse_manual_tests(self, response: str) -> List[ManualTestCase]:
         """Parse LLM response into ManualTestCase objects."""
         tests = []
@@ -291,36 +623,10 @@ class TestGenerator:
             json_data = self._extract_json(response)
 
             if json_data and 'test_cases' in json_data:
-                for tc_data in json_data['test_cases']:
-                    try:
-                        # Parse test steps
-                        steps = []
-                        for step_data in tc_data.get('test_steps', []):
-                            steps.append(TestStep(
-                                step_number=step_data.get('step_number', len(steps) + 1),
-                                action=step_data.get('action', ''),
-                                test_data=step_data.get('test_data', ''),
-                                expected_result=step_data.get('expected_result', '')
-                            ))
-
-                        test = ManualTestCase(
-                            test_id=tc_data.get('test_id', f'TC_{len(tests)+1:03d}'),
-                            test_name=tc_data.get('test_name', 'Unnamed Test'),
-                            description=tc_data.get('description', ''),
-                            preconditions=tc_data.get('preconditions', []),
-                            test_steps=steps,
-                            expected_results=tc_data.get('expected_results', []),
-                            priority=tc_data.get('priority', 'Medium'),
-                            category=tc_data.get('category', 'Functional'),
-                            tags=tc_data.get('tags', [])
-                        )
-                        tests.append(test)
-                    except Exception as e:
-                        print(f"Warning: Failed to parse test case: {e}")
-                        continue
+                tests = self._build_manual_tests(json_data['test_cases'])
 
         except Exception as e:
-            print(f"Warning: Failed to parse JSON response: {e}")
+            logger.warning("Failed to parse JSON response: %s", e)
             # Fall back to creating a basic test case
             tests.append(ManualTestCase(
                 test_id="TC_001",
@@ -335,43 +641,43 @@ class TestGenerator:
 
         return tests
 
+    def _build_manual_tests(self, test_cases: List[Dict[str, Any]]) -> List[ManualTestCase]:
+        """Build test cases from parsed JSON, skipping entries that don't fit."""
+        tests = []
+        for i, tc_data in enumerate(test_cases, 1):
+            try:
+                tc_data.setdefault('test_id', f'TC_{i:03d}')
+                tests.append(ManualTestCase.from_dict(tc_data))
+            except Exception as e:
+                logger.warning("Failed to parse test case: %s", e)
+                continue
+        return tests
+
+    def _parse_batch_manual_tests(self, response: str) -> Dict[int, List[ManualTestCase]]:
+        """Parse a batched manual-test response into test cases keyed by req_id."""
+        results = {}
+        try:
+            json_data = self._extract_json(response)
+            for entry in (json_data or {}).get('requirements') or []:
+                try:
+                    req_id = int(entry['req_id'])
+                except (TypeError, KeyError, ValueError):
+                    continue
+                results[req_id] = self._build_manual_tests(entry.get('test_cases') or [])
+        except Exception as e:
+            logger.warning("Failed to parse batched JSON response: %s", e)
+
+        return results
+
     def _parse_gherkin_scripts(self, response: str) -> List[AutomationScript]:
         """Parse LLM response into Gherkin AutomationScript objects."""
         scripts = []
 
         try:
             json_data = self._extract_json(response)
-
-            if json_data and 'feature_files' in json_data:
-                for ff_data in json_data['feature_files']:
-                    content = ff_data.get('content', '')
-                    if content:  # Only add if there's actual content
-                        script = AutomationScript(
-                            script_type="gherkin",
-                            filename=ff_data.get('filename', 'feature.feature'),
-                            content=content,
-                            related_test_ids=ff_data.get('related_test_ids', []),
-                            feature_name=ff_data.get('feature_name', ''),
-                            scenario_count=ff_data.get('scenario_count', 0)
-                        )
-                        scripts.append(script)
-            elif json_data and 'scripts' in json_data:
-                # Some models return gherkin under 'scripts' key instead
-                for script_data in json_data['scripts']:
-                    content = script_data.get('content', '')
-                    if content:
-                        script = AutomationScript(
-                            script_type="gherkin",
-                            filename=script_data.get('filename', 'feature.feature'),
-                            content=content,
-                            related_test_ids=script_data.get('related_test_ids', []),
-                            feature_name=script_data.get('feature_name', script_data.get('description', '')),
-                            scenario_count=script_data.get('scenario_count', 0)
-                        )
-                        scripts.append(script)
-
+            scripts = self._gherkin_from_json(json_data)
         except Exception as e:
-            print(f"Warning: Failed to parse Gherkin JSON response: {e}")
+            logger.warning("Failed to parse Gherkin JSON response: %s", e)
 
         # Fallback: extract raw Gherkin feature content from response
         if not scripts:
@@ -379,26 +685,64 @@ class TestGenerator:
 
         return scripts
 
+    def _gherkin_from_json(self, json_data: Optional[Dict[str, Any]]) -> List[AutomationScript]:
+        """Build Gherkin AutomationScript objects from a parsed `feature_files`/`scripts` object."""
+        scripts = []
+
+        if json_data and 'feature_files' in json_data:
+            for ff_data in json_data['feature_files']:
+                content = ff_data.get('content', '')
+                if content:  # Only add if there's actual content
+                    script = AutomationScript(
+                        script_type="gherkin",
+                        filename=ff_data.get('filename', 'feature.feature'),
+                        content=content,
+                        related_test_ids=ff_data.get('related_test_ids', []),
+                        feature_name=ff_data.get('feature_name', ''),
+                        scenario_count=ff_data.get('scenario_count', 0)
+                    )
+                    scripts.append(script)
+        elif json_data and 'scripts' in json_data:
+            # Some models return gherkin under 'scripts' key instead
+            for script_data in json_data['scripts']:
+                content = script_data.get('content', '')
+                if content:
+                    script = AutomationScript(
+                        script_type="gherkin",
+                        filename=script_data.get('filename', 'feature.feature'),
+                        content=content,
+                        related_test_ids=script_data.get('related_test_ids', []),
+                        feature_name=script_data.get('feature_name', script_data.get('description', '')),
+                        scenario_count=script_data.get('scenario_count', 0)
+                    )
+                    scripts.append(script)
+
+        return scripts
+
     def _extract_raw_gherkin(self, response: str) -> List[AutomationScript]:
         """Fallback: extract Gherkin feature blocks directly from raw LLM response text."""
         scripts = []
-        # Look for Feature: blocks in the raw response
-        feature_pattern = re.compile(
-            r'(Feature:.*?)(?=\nFeature:|\Z)',
-            re.DOTALL
-        )
-        matches = feature_pattern.findall(response)
-
-        for i, match in enumerate(matches):
-            content = match.strip()
+        # Single pass over Feature:/Scenario: keywords. The first Feature:, or
+        # one at the start of a line, opens a block; scenarios are counted as
+        # they are seen instead of rescanning each block afterwards.
+        blocks = []  # [start offset, scenario count]
+        for token in _GHERKIN_TOKEN.finditer(response):
+            start = token.start()
+            if token.group().startswith('Feature'):
+                if not blocks or response[start - 1] == '\n':
+                    blocks.append([start, 0])
+            elif blocks:
+                blocks[-1][1] += 1
+
+        for i, (start, scenario_count) in enumerate(blocks):
+            end = blocks[i + 1][0] if i + 1 < len(blocks) else len(response)
+            content = response[start:end].strip()
             if content and 'Scenario' in content:
                 # Extract feature name
-                feature_name_match = re.match(r'Feature:\s*(.+)', content)
+                feature_name_match = _FEATURE_NAME.match(content)
                 feature_name = feature_name_match.group(1).strip() if feature_name_match else f"Feature {i+1}"
-                # Count scenarios
-                scenario_count = len(re.findall(r'Scenario(?:\s+Outline)?:', content))
 
-                filename = re.sub(r'[^a-zA-Z0-9_]', '_', feature_name.lower())[:50] + '.feature'
+                filename = feature_name.lower().translate(_FILENAME_TABLE)[:50] + '.feature'
                 scripts.append(AutomationScript(
                     script_type="gherkin",
                     filename=filename,
@@ -416,35 +760,9 @@ class TestGenerator:
 
         try:
             json_data = self._extract_json(response)
-
-            if json_data and 'scripts' in json_data:
-                for script_data in json_data['scripts']:
-                    content = script_data.get('content', '')
-                    if content:  # Only add if there's actual content
-                        script = AutomationScript(
-                            script_type=script_type,
-                            filename=script_data.get('filename', f'test.{script_type}'),
-                            content=content,
-                            related_test_ids=script_data.get('related_test_ids', []),
-                            feature_name=script_data.get('description', '')
-                        )
-                        scripts.append(script)
-            elif json_data and 'feature_files' in json_data:
-                # Some models might use feature_files key for any script type
-                for script_data in json_data['feature_files']:
-                    content = script_data.get('content', '')
-                    if content:
-                        script = AutomationScript(
-                            script_type=script_type,
-                            filename=script_data.get('filename', f'test.{script_type}'),
-                            content=content,
-                            related_test_ids=script_data.get('related_test_ids', []),
-                            feature_name=script_data.get('description', script_data.get('feature_name', ''))
-                        )
-                        scripts.append(script)
-
+            scripts = self._scripts_from_json(json_data, script_type)
         except Exception as e:
-            print(f"Warning: Failed to parse {script_type} JSON response: {e}")
+            logger.warning("Failed to parse %s JSON response: %s", script_type, e)
 
         # Fallback: extract raw code blocks from response
         if not scripts:
@@ -452,25 +770,86 @@ class TestGenerator:
 
         return scripts
 
+    def _parse_combined_scripts(self, response: str, targets: tuple) -> Dict[str, List[AutomationScript]]:
+        """Split a combined automation response into scripts per target."""
+        results = {}
+
+        try:
+            json_data = self._extract_json(response) or {}
+        except Exception as e:
+            logger.warning("Failed to parse combined automation JSON response: %s", e)
+            json_data = {}
+
+        for target in targets:
+            scripts = []
+            section = json_data.get(target)
+            if isinstance(section, list):
+                section = {'scripts': section}
+            try:
+                if target == "gherkin":
+                    scripts = self._gherkin_from_json(section)
+                else:
+                    scripts = self._scripts_from_json(section, target)
+            except Exception as e:
+                logger.warning("Failed to parse %s section of combined response: %s", target, e)
+
+            # Fallback: the model skipped or mangled this key
+            if not scripts:
+                if target == "gherkin":
+                    scripts = self._extract_raw_gherkin(response)
+                else:
+                    scripts = self._extract_raw_code_blocks(response, target)
+            results[target] = scripts
+
+        return results
+
+    def _scripts_from_json(self, json_data: Optional[Dict[str, Any]], script_type: str) -> List[AutomationScript]:
+        """Build AutomationScript objects from a parsed `scripts`/`feature_files` object."""
+        scripts = []
+
+        if json_data and 'scripts' in json_data:
+            for script_data in json_data['scripts']:
+                content = script_data.get('content', '')
+                if content:  # Only add if there's actual content
+                    script = AutomationScript(
+                        script_type=script_type,
+                        filename=script_data.get('filename', f'test.{script_type}'),
+                        content=content,
+                        related_test_ids=script_data.get('related_test_ids', []),
+                        feature_name=script_data.get('description', '')
+                    )
+                    scripts.append(script)
+        elif json_data and 'feature_files' in json_data:
+            # Some models might use feature_files key for any script type
+            for script_data in json_data['feature_files']:
+                content = script_data.get('content', '')
+                if content:
+                    script = AutomationScript(
+                        script_type=script_type,
+                        filename=script_data.get('filename', f'test.{script_type}'),
+                        content=content,
+                        related_test_ids=script_data.get('related_test_ids', []),
+                        feature_name=script_data.get('description', script_data.get('feature_name', ''))
+                    )
+                    scripts.append(script)
+
+        return scripts
+
     def _extract_raw_code_blocks(self, response: str, script_type: str) -> List[AutomationScript]:
         """Fallback: extract code blocks from raw LLM response when JSON parsing fails."""
         scripts = []
 
-        # Determine language hints for code block detection
+        # Pick the code block pattern for the script's language
         if script_type == "selenium":
-            lang_hints = ['python', 'py']
+            code_block_pattern = _PY_CODE_BLOCK
             file_ext = '.py'
             code_indicators = ['import', 'def test_', 'class Test', 'selenium', 'webdriver']
         else:  # playwright
-            lang_hints = ['javascript', 'js', 'typescript', 'ts']
+            code_block_pattern = _JS_CODE_BLOCK
             file_ext = '.spec.js'
             code_indicators = ['test(', 'expect(', 'page.', 'playwright', 'require(', 'import ']
 
         # Extract code from markdown code blocks
-        code_block_pattern = re.compile(
-            r'```(?:' + '|'.join(lang_hints) + r')?\s*\n(.*?)```',
-            re.DOTALL | re.IGNORECASE
-        )
         matches = code_block_pattern.findall(response)
 
         for i, code in enumerate(matches):
@@ -489,25 +868,35 @@ class TestGenerator:
 
     def _extract_json(self, text: str) -> Optional[Dict[str, Any]]:
         """Extract JSON object from text that may contain other content."""
+        if len(text) > _MAX_JSON_CHARS or not _within_json_depth(text):
+            logger.warning("Ignoring LLM response: too large or too deeply nested to parse as JSON")
+            return None
+
         # Try to find JSON block in markdown code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', text)
+        json_match = _JSON_FENCED.search(text)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                return _json_loads(json_match.group(1))
             except json.JSONDecodeError:
                 pass
 
-        # Try to find raw JSON object
-        json_match = re.search(r'\{[\s\S]*\}', text)
-        if json_match:
+        # Try to find raw JSON object: decode in place from each '{' so the
+        # C decoder finds the matching brace, instead of regex-matching up
+        # to the last '}' in the text
+        start = text.find('{')
+        while start != -1:
             try:
-                return json.loads(json_match.group(0))
+                obj, _ = _JSON_DECODER.raw_decode(text, start)
             except json.JSONDecodeError:
-                pass
+                start = text.find('{', start + 1)
+                continue
+            if isinstance(obj, dict):
+                return obj
+            start = text.find('{', start + 1)
 
         # Try parsing the entire response
         try:
-            return json.loads(text)
+            return _json_loads(text)
         except json.JSONDecodeError:
             pass
 
@@ -530,7 +919,9 @@ class TestGenerator:
         Returns:
             List of additional test cases to add
         """
-        current_tests_json = json.dumps([t.to_dict() for t in current_tests], indent=2)
+        # The enhancement prompt keeps only the first 1500 characters of this,
+        # so don't serialize the whole suite
+        current_tests_json = _json_dumps([t.to_dict() for t in current_tests[:20]])
         context_text = client_context.get_context_text() if client_context else ""
 
         prompt = PromptTemplates.get_enhancement_prompt(
@@ -548,24 +939,19 @@ class TestGenerator:
                 start_id = len(current_tests) + 1
                 for i, tc_data in enumerate(json_data['additional_tests']):
                     tc_data['test_id'] = f'TC_{start_id + i:03d}'
-                    steps = []
-                    for step_data in tc_data.get('test_steps', []):
-                        steps.append(TestStep(
-                            step_number=step_data.get('step_number', len(steps) + 1),
-                            action=step_data.get('action', ''),
-                            test_data=step_data.get('test_data', ''),
-                            expected_result=step_data.get('expected_result', '')
-                        ))
-                    tc_data['test_steps'] = steps
                     additional.append(ManualTestCase.from_dict(tc_data))
                 return additional
         except Exception as e:
-            print(f"Warning: Failed to parse enhancement response: {e}")
+            logger.warning("Failed to parse enhancement response: %s", e)
 
         return []
 
 
 # Factory function
 def get_test_generator(llm_adapter: Optional[LLMAdapter] = None) -> TestGenerator:
-    """Get a test generator instance."""
+    """Get a test generator instance.
+
+    Use it as a context manager (``with get_test_generator() as generator:``)
+    to release its worker threads when done.
+    """
     return TestGenerator(llm_adapter)
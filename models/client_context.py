@@ -1,14 +1,24 @@
 """
 Client context data model and management.
 """
-from dataclasses import dataclass, field, asdict
+import operator
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from storage.database import get_database, Database
 from storage.file_manager import get_file_manager, FileManager
 
 
+# ClientContext rule fields and the client_rules.rule_type each is stored under
+_RULE_FIELDS = (
+    ('navigation_rules', 'navigation'),
+    ('thumb_rules', 'thumb'),
+    ('business_rules', 'business'),
+    ('best_practices', 'best_practices'),
+)
+
+
 @dataclass
 class ClientContext:
     """
@@ -34,30 +44,55 @@ class ClientContext:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return asdict(self)
+        return {
+            'id': self.id,
+            'name': self.name,
+            'project_name': self.project_name,
+            'project_description': self.project_description,
+            'tech_stack': list(self.tech_stack),
+            'test_environment': self.test_environment,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'navigation_rules': list(self.navigation_rules),
+            'thumb_rules': list(self.thumb_rules),
+            'business_rules': list(self.business_rules),
+            'best_practices': list(self.best_practices),
+            'documents': [dict(doc) for doc in self.documents],
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ClientContext':
         """Create from dictionary."""
-        # Handle rules from database format
-        rules = data.pop('rules', {})
-        if rules:
-            data['navigation_rules'] = rules.get('navigation', [])
-            data['thumb_rules'] = rules.get('thumb', [])
-            data['business_rules'] = rules.get('business', [])
-            data['best_practices'] = rules.get('best_practices', [])
+        # Filter to only valid fields (membership test on the class's own
+        # field mapping; no per-call set of names)
+        values = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
 
-        # Filter to only valid fields
-        valid_fields = {f.name for f in cls.__dataclass_fields__.values()}
-        filtered_data = {k: v for k, v in data.items() if k in valid_fields}
+        # Handle rules from database format; `data` itself is left untouched
+        rules = data.get('rules')
+        if rules:
+            for field_name, rule_type in _RULE_FIELDS:
+                values[field_name] = rules.get(rule_type, [])
 
-        return cls(**filtered_data)
+        return cls(**values)
 
     def get_context_text(self) -> str:
         """
         Get formatted context text for LLM prompts.
         Combines all rules and relevant document content.
+
+        The text is built once and cached until a field is reassigned; after
+        mutating a rule list in place, reassign it to refresh the cache.
         """
+        # The cache remembers the field objects it was built from, so any
+        # reassignment (an identity change) invalidates it without hooking
+        # __setattr__, which would slow down every construction
+        current = _context_fields(self)
+        cached = self.__dict__.get('_context_text')
+        if cached is None or not all(map(operator.is_, cached[0], current)):
+            cached = self.__dict__['_context_text'] = (current, self._build_context_text())
+        return cached[1]
+
+    def _build_context_text(self) -> str:
         sections = []
 
         # Project info
@@ -77,34 +112,30 @@ class ClientContext:
         # Navigation rules
         if self.navigation_rules:
             sections.append("\n## Navigation Rules")
-            for rule in self.navigation_rules:
-                sections.append(f"- {rule}")
+            sections.extend(f"- {rule}" for rule in self.navigation_rules)
 
         # Thumb rules
         if self.thumb_rules:
             sections.append("\n## Thumb Rules (Testing Conventions)")
-            for rule in self.thumb_rules:
-                sections.append(f"- {rule}")
+            sections.extend(f"- {rule}" for rule in self.thumb_rules)
 
         # Business rules
         if self.business_rules:
             sections.append("\n## Business Rules")
-            for rule in self.business_rules:
-                sections.append(f"- {rule}")
+            sections.extend(f"- {rule}" for rule in self.business_rules)
 
         # Best practices
         if self.best_practices:
             sections.append("\n## Best Practices")
-            for practice in self.best_practices:
-                sections.append(f"- {practice}")
+            sections.extend(f"- {practice}" for practice in self.best_practices)
 
         # Document summaries
         if self.documents:
             sections.append("\n## Reference Documents")
             for doc in self.documents[:5]:  # Limit to 5 docs
-                content_preview = doc.get('content', '')[:500]
+                content = doc.get('content') or ''
                 sections.append(f"\n### {doc.get('filename', 'Document')}")
-                sections.append(content_preview + "..." if len(doc.get('content', '')) > 500 else content_preview)
+                sections.append(f"{content[:500]}..." if len(content) > 500 else content)
 
         return '\n'.join(sections)
 
@@ -125,6 +156,9 @@ class ClientContext:
         return " | ".join(summary) if summary else "No rules configured"
 
 
+_context_fields = operator.attrgetter(*ClientContext.__dataclass_fields__)
+
+
 class ClientContextManager:
     """
     Manager for client context CRUD operations.
@@ -147,22 +181,15 @@ class ClientContextManager:
         # Create in database
         client_id = self.db.create_client(client_data)
 
-        # Add rules if provided
-        for rule in client_data.get('navigation_rules', []):
-            if rule.strip():
-                self.db.add_client_rule(client_id, 'navigation', rule.strip())
-
-        for rule in client_data.get('thumb_rules', []):
-            if rule.strip():
-                self.db.add_client_rule(client_id, 'thumb', rule.strip())
-
-        for rule in client_data.get('business_rules', []):
-            if rule.strip():
-                self.db.add_client_rule(client_id, 'business', rule.strip())
-
-        for practice in client_data.get('best_practices', []):
-            if practice.strip():
-                self.db.add_client_rule(client_id, 'best_practices', practice.strip())
+        # Add rules if provided, in a single transaction
+        rules = [
+            (rule_type, rule.strip())
+            for field_name, rule_type in _RULE_FIELDS
+            for rule in client_data.get(field_name, [])
+            if rule.strip()
+        ]
+        if rules:
+            self.db.add_client_rules_bulk(client_id, rules)
 
         return self.get(client_id)
 
@@ -203,14 +230,7 @@ class ClientContextManager:
         Returns:
             List of ClientContext objects
         """
-        clients_data = self.db.get_all_clients()
-        contexts = []
-        for data in clients_data:
-            # Get full data including rules
-            full_data = self.db.get_client(data['id'])
-            if full_data:
-                contexts.append(ClientContext.from_dict(full_data))
-        return contexts
+        return [ClientContext.from_dict(data) for data in self.db.get_all_clients_full()]
 
     def update(self, client_id: str, client_data: Dict[str, Any]) -> Optional[ClientContext]:
         """
@@ -227,18 +247,14 @@ class ClientContextManager:
         if not self.db.update_client(client_id, client_data):
             return None
 
-        # Update rules
-        if 'navigation_rules' in client_data:
-            self.db.update_client_rules(client_id, 'navigation', client_data['navigation_rules'])
-
-        if 'thumb_rules' in client_data:
-            self.db.update_client_rules(client_id, 'thumb', client_data['thumb_rules'])
-
-        if 'business_rules' in client_data:
-            self.db.update_client_rules(client_id, 'business', client_data['business_rules'])
-
-        if 'best_practices' in client_data:
-            self.db.update_client_rules(client_id, 'best_practices', client_data['best_practices'])
+        # Update rules, replacing every provided type in a single transaction
+        rules_by_type = {
+            rule_type: client_data[field_name]
+            for field_name, rule_type in _RULE_FIELDS
+            if field_name in client_data
+        }
+        if rules_by_type:
+            self.db.replace_client_rules_bulk(client_id, rules_by_type)
 
         return self.get(client_id)
 
@@ -273,6 +289,19 @@ class ClientContextManager:
         """
         return self.db.add_client_document(client_id, filename, content, file_type)
 
+    def add_documents(self, client_id: str, documents: List[Tuple[str, str, str]]) -> List[int]:
+        """
+        Add several documents to client context in one transaction.
+
+        Args:
+            client_id: Client ID
+            documents: (filename, content, file_type) tuples
+
+        Returns:
+            Document IDs, in the order given
+        """
+        return self.db.add_client_documents_bulk(client_id, documents)
+
     def remove_document(self, document_id: int) -> bool:
         """
         Remove a document from client context.
@@ -287,7 +316,7 @@ class ClientContextManager:
 
     def get_client_names(self) -> List[str]:
         """Get list of all client names."""
-        return [c['name'] for c in self.db.get_all_clients()]
+        return self.db.get_client_names()
 
 
 # Factory function
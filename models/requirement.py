@@ -1,11 +1,16 @@
 """
 Requirement document model.
 """
+import re
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 
+# Filename clean-up for display names
+_EXT_RE = re.compile(r'\.(?:txt|pdf|docx|doc)$', re.IGNORECASE)
+_SEP_RE = re.compile(r'[_-]+')
 
-@dataclass
+
+@dataclass(slots=True)
 class Requirement:
     """
     Represents a parsed requirement document.
@@ -50,10 +55,8 @@ class Requirement:
     def get_display_name(self) -> str:
         """Get a clean display name from filename."""
         # Remove extension and clean up
-        name = self.filename
-        for ext in ['.txt', '.pdf', '.docx', '.doc']:
-            name = name.replace(ext, '')
-        return name.replace('_', ' ').replace('-', ' ').title()
+        name = _EXT_RE.sub('', self.filename)
+        return _SEP_RE.sub(' ', name).title()
 
     def get_content_preview(self, max_chars: int = 500) -> str:
         """Get a preview of the content."""
@@ -69,5 +72,5 @@ class Requirement:
             'word_count': self.word_count,
             'page_count': self.page_count,
             'char_count': len(self.content),
-            'line_count': len(self.content.split('\n')),
+            'line_count': self.content.count('\n') + 1,
         }
@@ -1,11 +1,23 @@
 """
 Test case data models for manual tests and automation scripts.
 """
-from dataclasses import dataclass, field, asdict
+import sys
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
 
+# Rule framing each test case in ManualTestCase.to_text()
+_SEPARATOR = '=' * 60
+
+# File extension for each AutomationScript.script_type
+_SCRIPT_EXTENSIONS = {
+    "gherkin": "feature",
+    "selenium": "py",
+    "playwright": "spec.js"
+}
+
+
 class Priority(Enum):
     """Test case priority levels."""
     HIGH = "High"
@@ -38,7 +50,7 @@ class TestCategory(Enum):
     BOUNDARY = "Boundary"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestStep:
     """
     Represents a single test step.
@@ -49,7 +61,12 @@ class TestStep:
     expected_result: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            'step_number': self.step_number,
+            'action': self.action,
+            'test_data': self.test_data,
+            'expected_result': self.expected_result,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TestStep':
@@ -65,7 +82,33 @@ class TestStep:
         return text
 
 
-@dataclass
+def _step_from_dict(data: Dict[str, Any], number: int) -> TestStep:
+    """Build a TestStep, filling in missing fields when `data` is incomplete."""
+    try:
+        # Saved suites always carry exactly the TestStep fields
+        return TestStep(**data)
+    except TypeError:
+        return TestStep(
+            step_number=data.get('step_number', number),
+            action=data.get('action', ''),
+            test_data=data.get('test_data', ''),
+            expected_result=data.get('expected_result', '')
+        )
+
+
+def _to_step(step: Any, number: int) -> TestStep:
+    """Build a TestStep from a step dict, a bare action string or a TestStep."""
+    if isinstance(step, TestStep):
+        return step
+    if isinstance(step, dict):
+        return _step_from_dict(step, number)
+    if isinstance(step, str):
+        # LLMs sometimes return steps as a plain list of actions
+        return TestStep(step_number=number, action=step)
+    raise TypeError(f"Unsupported test step: {step!r}")
+
+
+@dataclass(slots=True)
 class ManualTestCase:
     """
     Represents a manual test case with full details.
@@ -84,35 +127,54 @@ class ManualTestCase:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['test_steps'] = [step.to_dict() if isinstance(step, TestStep) else step
-                              for step in self.test_steps]
-        return data
+        return {
+            'test_id': self.test_id,
+            'test_name': self.test_name,
+            'description': self.description,
+            'preconditions': list(self.preconditions),
+            'test_steps': [step.to_dict() if isinstance(step, TestStep) else step
+                           for step in self.test_steps],
+            'expected_results': list(self.expected_results),
+            'priority': self.priority,
+            'category': self.category,
+            'status': self.status,
+            'tags': list(self.tags),
+            'notes': self.notes,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ManualTestCase':
-        """Create from dictionary."""
-        steps_data = data.pop('test_steps', [])
-        test_steps = []
-        for step in steps_data:
-            if isinstance(step, dict):
-                test_steps.append(TestStep.from_dict(step))
-            else:
-                test_steps.append(step)
-        data['test_steps'] = test_steps
-        return cls(**data)
+        """
+        Create from dictionary.
+
+        Also accepts parsed LLM output: unknown keys are ignored, and a missing
+        name, description or step field falls back to a default.
+        """
+        values = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        values.setdefault('test_name', 'Unnamed Test')
+        values.setdefault('description', '')
+        # Intern the enum-valued labels so exporters' lookups against the
+        # Priority/TestCategory/TestStatus literals hit the identity fast path
+        for key in ('priority', 'category', 'status'):
+            label = values.get(key)
+            if type(label) is str:
+                values[key] = sys.intern(label)
+        values['test_steps'] = [
+            _to_step(step, j + 1) for j, step in enumerate(values.get('test_steps') or [])
+        ]
+        return cls(**values)
 
     def to_text(self) -> str:
         """Format test case as readable text."""
         lines = [
-            f"{'='*60}",
+            _SEPARATOR,
             f"TEST CASE: {self.test_id}",
-            f"{'='*60}",
+            _SEPARATOR,
             f"TEST NAME: {self.test_name}",
-            f"",
-            f"DESCRIPTION:",
+            "",
+            "DESCRIPTION:",
             f"  {self.description}",
-            f"",
+            "",
             f"PRIORITY: {self.priority}",
             f"CATEGORY: {self.category}",
             f"STATUS: {self.status}",
@@ -121,46 +183,42 @@ class ManualTestCase:
         if self.tags:
             lines.append(f"TAGS: {', '.join(self.tags)}")
 
-        lines.append("")
-        lines.append("PRECONDITIONS:")
+        lines.append("\nPRECONDITIONS:")
         for pre in self.preconditions:
             lines.append(f"  - {pre}")
 
-        lines.append("")
-        lines.append("TEST STEPS:")
+        lines.append("\nTEST STEPS:")
         for step in self.test_steps:
             lines.append(f"  {step.to_text()}")
 
-        lines.append("")
-        lines.append("EXPECTED RESULTS:")
+        lines.append("\nEXPECTED RESULTS:")
         for i, result in enumerate(self.expected_results, 1):
             lines.append(f"  {i}. {result}")
 
         if self.notes:
-            lines.append("")
-            lines.append(f"NOTES: {self.notes}")
+            lines.append(f"\nNOTES: {self.notes}")
 
-        lines.append(f"{'='*60}")
+        lines.append(_SEPARATOR)
 
         return '\n'.join(lines)
 
     def get_steps_text(self) -> str:
         """Get all steps as formatted text for export."""
         return '\n'.join([
-            f"{s.step_number}. {s.action}" + (f" [Data: {s.test_data}]" if s.test_data else "")
+            f"{s.step_number}. {s.action} [Data: {s.test_data}]" if s.test_data else f"{s.step_number}. {s.action}"
             for s in self.test_steps
         ])
 
     def get_expected_results_text(self) -> str:
         """Get all expected results as formatted text for export."""
-        return '\n'.join([f"{i+1}. {r}" for i, r in enumerate(self.expected_results)])
+        return '\n'.join([f"{i}. {r}" for i, r in enumerate(self.expected_results, 1)])
 
     def get_preconditions_text(self) -> str:
         """Get preconditions as formatted text for export."""
         return '\n'.join([f"- {p}" for p in self.preconditions])
 
 
-@dataclass
+@dataclass(slots=True)
 class AutomationScript:
     """
     Represents an automation script (Gherkin, Selenium, Playwright).
@@ -173,7 +231,14 @@ class AutomationScript:
     scenario_count: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            'script_type': self.script_type,
+            'filename': self.filename,
+            'content': self.content,
+            'related_test_ids': list(self.related_test_ids),
+            'feature_name': self.feature_name,
+            'scenario_count': self.scenario_count,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AutomationScript':
@@ -181,15 +246,10 @@ class AutomationScript:
 
     def get_extension(self) -> str:
         """Get file extension for this script type."""
-        extensions = {
-            "gherkin": "feature",
-            "selenium": "py",
-            "playwright": "spec.js"
-        }
-        return extensions.get(self.script_type, "txt")
+        return _SCRIPT_EXTENSIONS.get(self.script_type, "txt")
 
 
-@dataclass
+@dataclass(slots=True)
 class TestSuite:
     """
     Collection of test cases and automation scripts.
@@ -244,5 +304,9 @@ class TestSuite:
 
     def get_total_count(self) -> int:
         """Get total number of tests."""
-        summary = self.get_summary()
-        return sum(summary.values())
+        return (
+            len(self.manual_tests)
+            + sum(s.scenario_count for s in self.gherkin_scripts)
+            + len(self.selenium_scripts)
+            + len(self.playwright_scripts)
+        )
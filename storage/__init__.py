@@ -1,5 +1,6 @@
 # Storage module
 from .database import Database, get_database
 from .file_manager import FileManager
+from .response_store import ResponseStore, get_response_store
 
-__all__ = ['Database', 'get_database', 'FileManager']
+__all__ = ['Database', 'get_database', 'FileManager', 'ResponseStore', 'get_response_store']
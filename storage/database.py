@@ -3,19 +3,50 @@ SQLite database operations for persistent storage.
 """
 import sqlite3
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from contextlib import contextmanager
 
 from config.settings import DB_PATH
 
 
+# Client row with its rules and documents aggregated into JSON arrays, so a
+# client is fetched in one round trip; callers append the WHERE clause
+_CLIENT_WITH_DETAILS_SQL = '''
+    SELECT c.*,
+        (SELECT json_group_array(json_array(rule_type, rule_content))
+         FROM (SELECT rule_type, rule_content FROM client_rules
+               WHERE client_id = c.id ORDER BY id)) AS rules_json,
+        (SELECT json_group_array(json_object(
+             'id', id, 'filename', filename, 'content', content,
+             'file_type', file_type, 'uploaded_at', uploaded_at))
+         FROM (SELECT id, filename, content, file_type, uploaded_at FROM client_documents
+               WHERE client_id = c.id ORDER BY id)) AS documents_json
+    FROM clients c
+'''
+
+
 class Database:
     """SQLite database manager for application data."""
 
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
+        # One connection reused for every query; the lock serializes access
+        # across threads (methods never nest while holding it)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        # WAL with synchronous=NORMAL avoids an fsync per commit; the journal
+        # mode persists in the file, the rest apply to this connection
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA temp_store = MEMORY")
+        self._conn.execute("PRAGMA cache_size = -64000")
+        self._conn.execute("PRAGMA mmap_size = 268435456")
+        self._conn.execute("PRAGMA busy_timeout = 10000")
         self._init_database()
 
     def _init_database(self) -> None:
@@ -80,14 +111,20 @@ class Database:
 
     @contextmanager
     def _get_connection(self):
-        """Get database connection with context manager."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Get the shared database connection for the duration of the block."""
+        with self._lock:
+            try:
+                yield self._conn
+            except BaseException:
+                # Don't leave a failed write's transaction open for the next caller
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
 
     # Client operations
     def create_client(self, client_data: Dict[str, Any]) -> str:
@@ -119,27 +156,32 @@ class Database:
         """Get client by ID."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM clients WHERE id = ?', (client_id,))
+            cursor.execute(_CLIENT_WITH_DETAILS_SQL + 'WHERE c.id = ?', (client_id,))
             row = cursor.fetchone()
 
-            if row:
-                client = dict(row)
-                client['tech_stack'] = json.loads(client['tech_stack'] or '[]')
-                client['rules'] = self.get_client_rules(client_id)
-                client['documents'] = self.get_client_documents(client_id)
-                return client
-
-        return None
+        return self._client_from_details_row(row) if row else None
 
     def get_client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Get client by name."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT id FROM clients WHERE name = ?', (name,))
+            cursor.execute(_CLIENT_WITH_DETAILS_SQL + 'WHERE c.name = ?', (name,))
             row = cursor.fetchone()
-            if row:
-                return self.get_client(row['id'])
-        return None
+
+        return self._client_from_details_row(row) if row else None
+
+    @staticmethod
+    def _client_from_details_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Build a client dict from a _CLIENT_WITH_DETAILS_SQL row."""
+        client = dict(row)
+        client['tech_stack'] = json.loads(client['tech_stack'] or '[]')
+
+        rules = {'navigation': [], 'thumb': [], 'business': [], 'best_practices': []}
+        for rule_type, rule_content in json.loads(client.pop('rules_json')):
+            rules.setdefault(rule_type, []).append(rule_content)
+        client['rules'] = rules
+        client['documents'] = json.loads(client.pop('documents_json'))
+        return client
 
     def get_all_clients(self) -> List[Dict[str, Any]]:
         """Get all clients."""
@@ -156,6 +198,22 @@ class Database:
 
             return clients
 
+    def get_client_names(self) -> List[str]:
+        """Get all client names, sorted."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name FROM clients ORDER BY name')
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_all_clients_full(self) -> List[Dict[str, Any]]:
+        """Get all clients with their rules and documents, as get_client returns them."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_CLIENT_WITH_DETAILS_SQL + 'ORDER BY c.name')
+            rows = cursor.fetchall()
+
+        return [self._client_from_details_row(row) for row in rows]
+
     def update_client(self, client_id: str, client_data: Dict[str, Any]) -> bool:
         """Update client data."""
         now = datetime.now().isoformat()
@@ -201,6 +259,39 @@ class Database:
             conn.commit()
             return cursor.lastrowid
 
+    def add_client_rules_bulk(self, client_id: str, rules: Iterable[Tuple[str, str]]) -> int:
+        """Add (rule_type, rule_content) pairs to a client in one transaction."""
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO client_rules (client_id, rule_type, rule_content, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', [(client_id, rule_type, rule_content, now) for rule_type, rule_content in rules])
+            conn.commit()
+            return cursor.rowcount
+
+    def replace_client_rules_bulk(self, client_id: str, rules_by_type: Dict[str, List[str]]) -> None:
+        """Replace all rules of each given type for a client in one transaction."""
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                'DELETE FROM client_rules WHERE client_id = ? AND rule_type = ?',
+                [(client_id, rule_type) for rule_type in rules_by_type]
+            )
+            cursor.executemany('''
+                INSERT INTO client_rules (client_id, rule_type, rule_content, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (client_id, rule_type, rule.strip(), now)
+                for rule_type, rules in rules_by_type.items()
+                for rule in rules if rule.strip()
+            ])
+            conn.commit()
+
     def get_client_rules(self, client_id: str, rule_type: Optional[str] = None) -> Dict[str, List[str]]:
         """Get client rules organized by type."""
         with self._get_connection() as conn:
@@ -245,10 +336,7 @@ class Database:
 
     def update_client_rules(self, client_id: str, rule_type: str, rules: List[str]) -> None:
         """Replace all rules of a type for a client."""
-        self.delete_client_rules(client_id, rule_type)
-        for rule in rules:
-            if rule.strip():
-                self.add_client_rule(client_id, rule_type, rule.strip())
+        self.replace_client_rules_bulk(client_id, {rule_type: rules})
 
     # Document operations
     def add_client_document(self, client_id: str, filename: str, content: str, file_type: str) -> int:
@@ -264,6 +352,26 @@ class Database:
             conn.commit()
             return cursor.lastrowid
 
+    def add_client_documents_bulk(self, client_id: str,
+                                  documents: Iterable[Tuple[str, str, str]]) -> List[int]:
+        """Add (filename, content, file_type) documents to a client in one transaction.
+
+        Returns the new document IDs in input order.
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            doc_ids = []
+            for filename, content, file_type in documents:
+                cursor.execute('''
+                    INSERT INTO client_documents (client_id, filename, content, file_type, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (client_id, filename, content, file_type, now))
+                doc_ids.append(cursor.lastrowid)
+            conn.commit()
+            return doc_ids
+
     def get_client_documents(self, client_id: str) -> List[Dict[str, Any]]:
         """Get all documents for a client."""
         with self._get_connection() as conn:
@@ -11,6 +11,19 @@ from typing import Optional, List, Dict, Any, BinaryIO
 
 from config.settings import CLIENTS_DIR, EXPORTS_DIR
 
+try:
+    import orjson
+
+    def _json_dump_bytes(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    _json_load_bytes = orjson.loads
+except ImportError:  # orjson is optional; output is the same indented UTF-8 JSON
+    def _json_dump_bytes(data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+    _json_load_bytes = json.loads
+
 
 class FileManager:
     """
@@ -25,16 +38,14 @@ class FileManager:
     def save_client_json(self, client_id: str, data: Dict[str, Any]) -> Path:
         """Save client data to JSON file."""
         file_path = self.clients_dir / f"{client_id}.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        file_path.write_bytes(_json_dump_bytes(data))
         return file_path
 
     def load_client_json(self, client_id: str) -> Optional[Dict[str, Any]]:
         """Load client data from JSON file."""
         file_path = self.clients_dir / f"{client_id}.json"
         if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _json_load_bytes(file_path.read_bytes())
         return None
 
     def delete_client_json(self, client_id: str) -> bool:
@@ -0,0 +1,92 @@
+"""
+Persistent on-disk cache of LLM responses.
+
+Backs CachingAdapter so responses survive an app restart: re-running the
+same generation in a new session is answered from disk instead of the LLM.
+"""
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from config.settings import RESPONSE_CACHE_PATH
+
+
+class ResponseStore:
+    """SQLite (WAL) store mapping request digests to compressed responses."""
+
+    def __init__(self, db_path: Path = RESPONSE_CACHE_PATH, max_entries: int = 5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # One shared connection; the lock serializes access across threads
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key BLOB PRIMARY KEY,
+                model TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                response BLOB NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed)")
+        self._conn.commit()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached response for `key`, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: bytes, response: str, model: str = "") -> None:
+        """Store a response, evicting the least recently used beyond max_entries."""
+        blob = zlib.compress(response.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, model, created, accessed, response) VALUES (?, ?, ?, ?, ?)",
+                (key, model, now, now, blob)
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed ASC, rowid ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Global response store instance
+_response_store: Optional[ResponseStore] = None
+
+
+def get_response_store() -> ResponseStore:
+    """Get the global response store instance."""
+    global _response_store
+    if _response_store is None:
+        _response_store = ResponseStore()
+    return _response_store
@@ -2,6 +2,9 @@
 Prompt templates for test case generation.
 Optimized for local LLM models (faster response times).
 """
+import functools
+from typing import List
+
 
 class PromptTemplates:
     """
@@ -42,6 +45,29 @@ Return ONLY valid JSON in this exact format:
 Generate 5-10 test cases covering:
 {additional_instructions}
 
+Return ONLY the JSON, no other text."""
+
+    # Several requirement documents in one call, answered per document
+    BATCH_MANUAL_TEST_GENERATION = """Generate manual test cases for each of these {count} requirement documents:
+
+{requirements}
+{client_context}
+
+Return ONLY valid JSON with one entry per document, in this exact format:
+{{
+  "requirements": [
+    {{
+      "req_id": 1,
+      "test_cases": [
+        {{"test_id": "TC_001", "test_name": "Brief descriptive name", "description": "What this test verifies", "preconditions": ["condition1"], "test_steps": [{{"step_number": 1, "action": "Do something", "test_data": "data", "expected_result": "Result"}}], "expected_results": ["Final outcome"], "priority": "High", "category": "Functional", "tags": ["tag1"]}}
+      ]
+    }}
+  ]
+}}
+
+For each document generate 5-10 test cases covering:
+{additional_instructions}
+
 Return ONLY the JSON, no other text."""
 
     # Gherkin generation prompt
@@ -104,6 +130,36 @@ Return ONLY valid JSON:
 
 Use @playwright/test, async/await, proper locators. Return ONLY JSON."""
 
+    # Combined automation prompt: several script types from one request, so
+    # the shared manual-test prefix is only sent (and prefilled) once
+    COMBINED_AUTOMATION_GENERATION = """Generate automated tests for:
+
+{manual_tests}
+
+Return ONLY valid JSON with exactly these top-level keys:
+{{
+{envelope}
+}}
+
+{instructions}
+Return ONLY JSON."""
+
+    # Per-target entries of the combined automation envelope
+    AUTOMATION_TARGETS = {
+        "gherkin": (
+            """  "gherkin": {"feature_files": [{"filename": "feature_name.feature", "feature_name": "Feature Name", "content": "Feature: Name\\n  Scenario: Test\\n    Given...\\n    When...\\n    Then...", "scenario_count": 3, "related_test_ids": ["TC_001"]}]}""",
+            "- gherkin: Gherkin feature files in Given/When/Then format."
+        ),
+        "selenium": (
+            """  "selenium": {"scripts": [{"filename": "test_feature.py", "content": "import pytest\\nfrom selenium import webdriver\\n...", "related_test_ids": ["TC_001"], "description": "Feature tests"}]}""",
+            "- selenium: Selenium Python tests. Use pytest, explicit waits, Page Object Model."
+        ),
+        "playwright": (
+            """  "playwright": {"scripts": [{"filename": "feature.spec.js", "content": "const { test, expect } = require('@playwright/test');\\n...", "related_test_ids": ["TC_001"], "description": "Feature tests"}]}""",
+            "- playwright: Playwright JavaScript tests. Use @playwright/test, async/await, proper locators."
+        ),
+    }
+
     # Enhancement prompt
     ENHANCE_TESTS = """Add missing test cases to this list:
 
@@ -120,12 +176,53 @@ Add ONLY new tests not already covered. Return JSON:
 
 Return ONLY JSON."""
 
+    # The get_*_prompt builders are pure functions of their (hashable)
+    # arguments, so retries and repeat runs reuse the assembled prompt.
+    # The batch builder takes a list and is not cached.
     @classmethod
+    @functools.lru_cache(maxsize=32)
     def get_manual_test_prompt(cls, requirements: str, client_context: str = "",
                                 include_edge_cases: bool = True,
                                 include_negative: bool = True,
                                 include_boundary: bool = True) -> str:
         """Build the manual test generation prompt with options."""
+        # Limit requirements to prevent token overflow
+        req_text = requirements[:3000] if len(requirements) > 3000 else requirements
+
+        return cls.MANUAL_TEST_GENERATION.format(
+            requirements=req_text,
+            client_context=cls._client_context_section(client_context),
+            additional_instructions=cls._coverage_instructions(
+                include_edge_cases, include_negative, include_boundary
+            )
+        )
+
+    @classmethod
+    def get_batch_manual_test_prompt(cls, requirements: List[str], client_context: str = "",
+                                     include_edge_cases: bool = True,
+                                     include_negative: bool = True,
+                                     include_boundary: bool = True) -> str:
+        """Build one manual test prompt covering several requirement documents.
+
+        Documents are numbered from 1; the response echoes that number as `req_id`.
+        """
+        sections = [
+            f"Requirement {i}:\n{text[:3000]}" for i, text in enumerate(requirements, 1)
+        ]
+
+        return cls.BATCH_MANUAL_TEST_GENERATION.format(
+            count=len(requirements),
+            requirements="\n\n".join(sections),
+            client_context=cls._client_context_section(client_context),
+            additional_instructions=cls._coverage_instructions(
+                include_edge_cases, include_negative, include_boundary
+            )
+        )
+
+    @staticmethod
+    def _coverage_instructions(include_edge_cases: bool, include_negative: bool,
+                               include_boundary: bool) -> str:
+        """List the kinds of tests to cover, one per line."""
         instructions = []
         instructions.append("- Positive/functional tests")
         if include_negative:
@@ -135,22 +232,16 @@ Return ONLY JSON."""
         if include_boundary:
             instructions.append("- Boundary value tests")
 
-        additional = "\n".join(instructions)
+        return "\n".join(instructions)
 
-        context = ""
+    @staticmethod
+    def _client_context_section(client_context: str) -> str:
         if client_context and client_context.strip():
-            context = f"\nClient context:\n{client_context[:1000]}"  # Limit context size
-
-        # Limit requirements to prevent token overflow
-        req_text = requirements[:3000] if len(requirements) > 3000 else requirements
-
-        return cls.MANUAL_TEST_GENERATION.format(
-            requirements=req_text,
-            client_context=context,
-            additional_instructions=additional
-        )
+            return f"\nClient context:\n{client_context[:1000]}"  # Limit context size
+        return ""
 
     @classmethod
+    @functools.lru_cache(maxsize=32)
     def get_gherkin_prompt(cls, manual_tests: str, requirements_summary: str,
                            client_context: str = "") -> str:
         """Build the Gherkin generation prompt."""
@@ -164,6 +255,7 @@ Return ONLY JSON."""
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=32)
     def get_selenium_prompt(cls, manual_tests: str, requirements_summary: str,
                             client_context: str = "") -> str:
         """Build the Selenium generation prompt."""
@@ -175,6 +267,7 @@ Return ONLY JSON."""
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=32)
     def get_playwright_prompt(cls, manual_tests: str, requirements_summary: str,
                               client_context: str = "") -> str:
         """Build the Playwright generation prompt."""
@@ -186,6 +279,22 @@ Return ONLY JSON."""
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=32)
+    def get_combined_automation_prompt(cls, manual_tests: str, requirements_summary: str,
+                                       client_context: str = "",
+                                       targets: tuple = ("gherkin", "selenium", "playwright")) -> str:
+        """Build one prompt asking for several automation script types at once."""
+        tests = manual_tests[:2000] if len(manual_tests) > 2000 else manual_tests
+        entries = [cls.AUTOMATION_TARGETS[target] for target in targets]
+
+        return cls.COMBINED_AUTOMATION_GENERATION.format(
+            manual_tests=tests,
+            envelope=",\n".join(envelope for envelope, _ in entries),
+            instructions="\n".join(instruction for _, instruction in entries) + "\n"
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
     def get_enhancement_prompt(cls, current_tests: str, requirements: str,
                                client_context: str = "") -> str:
         """Build the test enhancement prompt."""
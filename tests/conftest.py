@@ -233,7 +233,8 @@ def temp_db(tmp_path):
     """Create a temporary database for testing."""
     db_path = tmp_path / "test_app.db"
     db = Database(db_path=db_path)
-    return db
+    yield db
+    db.close()
 
 
 # ──────────────────────────────────────────────
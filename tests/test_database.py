@@ -31,6 +31,28 @@ class TestDatabaseInit:
             result = cursor.fetchone()
             assert result[0] == 1
 
+    def test_wal_enabled(self, temp_db):
+        """The database should use WAL with synchronous=NORMAL."""
+        with temp_db._get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    def test_connection_reused(self, temp_db):
+        """Every call should share one connection."""
+        with temp_db._get_connection() as first:
+            pass
+        with temp_db._get_connection() as second:
+            pass
+        assert first is second
+
+    def test_failed_write_rolled_back(self, temp_db):
+        """A failing write should not leave its transaction open."""
+        temp_db.create_client({"name": "Unique Corp"})
+        with pytest.raises(Exception):
+            temp_db.create_client({"name": "Unique Corp"})
+        with temp_db._get_connection() as conn:
+            assert not conn.in_transaction
+
 
 class TestClientOperations:
     """Tests for client CRUD operations."""
@@ -60,6 +82,20 @@ class TestClientOperations:
         client = temp_db.get_client("nonexistent")
         assert client is None
 
+    def test_get_client_includes_rules_and_documents(self, temp_db):
+        client_id = temp_db.create_client({"name": "Detail Corp"})
+        temp_db.add_client_rule(client_id, "navigation", "Start from home page")
+        temp_db.add_client_rule(client_id, "navigation", "Use breadcrumbs")
+        doc_id = temp_db.add_client_document(client_id, "spec.txt", "Content", None)
+
+        client = temp_db.get_client(client_id)
+        assert client["rules"] == temp_db.get_client_rules(client_id)
+        assert client["rules"]["navigation"] == ["Start from home page", "Use breadcrumbs"]
+        assert client["documents"] == temp_db.get_client_documents(client_id)
+        assert client["documents"][0]["id"] == doc_id
+        assert client["documents"][0]["file_type"] is None
+        assert "rules_json" not in client
+
     def test_get_client_by_name(self, temp_db):
         temp_db.create_client({"name": "FindMe Corp"})
         client = temp_db.get_client_by_name("FindMe Corp")
@@ -72,6 +108,22 @@ class TestClientOperations:
         clients = temp_db.get_all_clients()
         assert len(clients) == 2
 
+    def test_get_client_names(self, temp_db):
+        temp_db.create_client({"name": "Client B"})
+        temp_db.create_client({"name": "Client A"})
+        assert temp_db.get_client_names() == ["Client A", "Client B"]
+
+    def test_get_all_clients_full_matches_get_client(self, temp_db):
+        a = temp_db.create_client({"name": "Client A", "tech_stack": ["React"]})
+        b = temp_db.create_client({"name": "Client B"})
+        temp_db.add_client_rule(a, "navigation", "Start from home page")
+        temp_db.add_client_rule(b, "business", "Verify email first")
+        temp_db.add_client_document(b, "spec.txt", "Content", "txt")
+
+        clients = temp_db.get_all_clients_full()
+        assert [c["name"] for c in clients] == ["Client A", "Client B"]
+        assert clients == [temp_db.get_client(a), temp_db.get_client(b)]
+
     def test_update_client(self, temp_db):
         client_id = temp_db.create_client({"name": "Old Name"})
         updated = temp_db.update_client(client_id, {
@@ -137,6 +189,34 @@ class TestClientRules:
         assert "New rule A" in rules["navigation"]
         assert "Old rule 1" not in rules["navigation"]
 
+    def test_add_rules_bulk(self, temp_db):
+        client_id = temp_db.create_client({"name": "Bulk Corp"})
+        count = temp_db.add_client_rules_bulk(client_id, [
+            ("navigation", "Start from home page"),
+            ("navigation", "Use breadcrumbs"),
+            ("business", "Verify email first"),
+        ])
+        assert count == 3
+
+        rules = temp_db.get_client_rules(client_id)
+        assert rules["navigation"] == ["Start from home page", "Use breadcrumbs"]
+        assert rules["business"] == ["Verify email first"]
+
+    def test_replace_rules_bulk_only_touches_given_types(self, temp_db):
+        client_id = temp_db.create_client({"name": "BulkReplace Corp"})
+        temp_db.add_client_rule(client_id, "navigation", "Old nav")
+        temp_db.add_client_rule(client_id, "business", "Kept rule")
+
+        temp_db.replace_client_rules_bulk(client_id, {
+            "navigation": ["New nav", "  "],
+            "thumb": [" Test on mobile "],
+        })
+
+        rules = temp_db.get_client_rules(client_id)
+        assert rules["navigation"] == ["New nav"]
+        assert rules["thumb"] == ["Test on mobile"]
+        assert rules["business"] == ["Kept rule"]
+
     def test_delete_rules(self, temp_db):
         client_id = temp_db.create_client({"name": "DelRules Corp"})
         temp_db.add_client_rule(client_id, "navigation", "Rule 1")
@@ -235,6 +315,18 @@ class TestClientDocuments:
         docs = temp_db.get_client_documents(client_id)
         assert len(docs) == 2
 
+    def test_add_documents_bulk(self, temp_db):
+        client_id = temp_db.create_client({"name": "DocBulk"})
+        doc_ids = temp_db.add_client_documents_bulk(client_id, [
+            ("doc1.txt", "Content 1", "txt"),
+            ("doc2.pdf", "Content 2", "pdf"),
+        ])
+        assert len(doc_ids) == 2
+
+        docs = temp_db.get_client_documents(client_id)
+        assert [d["id"] for d in docs] == doc_ids
+        assert [d["filename"] for d in docs] == ["doc1.txt", "doc2.pdf"]
+
     def test_delete_document(self, temp_db):
         client_id = temp_db.create_client({"name": "DocDel"})
         doc_id = temp_db.add_client_document(client_id, "test.txt", "Content", "txt")
@@ -39,6 +39,14 @@ class TestExcelExport:
         # Check first test
         assert ws.cell(2, 1).value == "TC_001"
 
+    def test_auto_filter_covers_all_rows(self, sample_test_suite):
+        handler = ExportHandler()
+        content, _ = handler.export_to_excel(sample_test_suite)
+
+        import openpyxl
+        ws = openpyxl.load_workbook(io.BytesIO(content)).active
+        assert ws.auto_filter.ref == "A1:J4"
+
 
 class TestCsvExport:
     """Tests for CSV export."""
@@ -135,6 +143,23 @@ class TestPlaywrightExport:
         assert filename.endswith(".spec.js")
         assert "playwright" in content.lower() or "test" in content
 
+    @pytest.mark.parametrize("name, expected", [
+        ("login", "login.spec.js"),
+        ("login.js", "login.spec.js"),
+        ("login.spec.js", "login.spec.js"),
+    ])
+    def test_normalizes_spec_suffix(self, name, expected):
+        from models.test_case import AutomationScript, TestSuite
+        suite = TestSuite(
+            name="Test",
+            playwright_scripts=[AutomationScript(
+                script_type="playwright", filename=name, content="test('x', () => {});"
+            )]
+        )
+        handler = ExportHandler()
+        files = handler.export_playwright_files(suite)
+        assert files[0][1] == expected
+
 
 class TestZipExport:
     """Tests for ZIP bundle export."""
@@ -163,3 +188,14 @@ class TestZipExport:
             readme = zf.read("README.md").decode("utf-8")
             assert "Login Feature Tests" in readme
             assert "Manual Tests:" in readme
+
+    def test_zip_manual_only_has_no_script_dirs(self, sample_manual_tests):
+        from models.test_case import TestSuite
+        suite = TestSuite(name="Manual Only", manual_tests=sample_manual_tests)
+        handler = ExportHandler()
+        content, _ = handler.export_all_as_zip(suite, export_format="csv")
+
+        with zipfile.ZipFile(io.BytesIO(content), "r") as zf:
+            names = zf.namelist()
+            assert any(n.startswith("manual_tests/") for n in names)
+            assert not any(n.startswith(("gherkin/", "selenium/", "playwright/")) for n in names)
@@ -0,0 +1,587 @@
+"""
+Tests for the LLM adapter layer (core/llm_adapter.py).
+No network or model access: providers are replaced by in-memory fakes.
+"""
+import sys
+import threading
+import time
+import types
+from unittest import mock
+
+import pytest
+import requests
+
+import core.llm_adapter as llm_adapter
+from core.llm_adapter import (
+    BaseLLMAdapter, CachingAdapter, HuggingFaceAdapter, LLMAdapter, OllamaAdapter,
+    CodeLLMAdapter, RateLimitedAdapter, VLLMAdapter, VLLMConfig, _BatchWorker, _TokenBucket, _coalesce_chunks, _format_messages,
+)
+from config.llm_config import LLMProvider
+from config.settings import Settings
+from storage.response_store import ResponseStore
+
+
+class FakeAdapter(BaseLLMAdapter):
+    """Adapter answering 'echo: <prompt>' and recording every call."""
+
+    __slots__ = ("model", "calls", "delay", "error", "_lock")
+
+    def __init__(self, model: str = "fake", delay: float = 0.0, error: Exception = None):
+        self.model = model
+        self.calls = []
+        self.delay = delay
+        self.error = error
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, system_prompt=None):
+        with self._lock:
+            self.calls.append((prompt, system_prompt))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"echo: {prompt}"
+
+    def generate_stream(self, prompt, system_prompt=None):
+        yield from self.generate(prompt, system_prompt).split(" ")
+
+    def is_available(self):
+        return True
+
+    def get_models(self):
+        return [self.model]
+
+
+def _response(status_code, body, content_type="application/json"):
+    """Build a requests.Response without a network round trip."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+def _streamed(*chunks):
+    """Build a streamed requests.Response that reads back `chunks` as given."""
+    response = requests.Response()
+    response.status_code = 200
+    response.iter_content = lambda chunk_size=1: iter(chunks)
+    return response
+
+
+class TestFormatMessages:
+    """Tests for prompt joining on completion-style endpoints."""
+
+    def test_joins_system_prompt(self):
+        assert _format_messages("Write tests", "You are QA") == "You are QA\n\nWrite tests"
+
+    def test_without_system_prompt(self):
+        assert _format_messages("Write tests") == "Write tests"
+        assert _format_messages("Write tests", "") == "Write tests"
+
+
+class TestIterLines:
+    """Tests for splitting a streamed body into NDJSON lines."""
+
+    def test_lines_split_across_chunks(self):
+        response = _streamed(b'{"a": 1}\n{"b"', b': 2}\n', b'{"c": 3}\n')
+        assert list(llm_adapter._iter_lines(response)) == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    def test_blank_lines_and_crlf(self):
+        response = _streamed(b'one\r\n\r\n', b'\ntwo\r\n')
+        assert list(llm_adapter._iter_lines(response)) == [b"one", b"two"]
+
+    def test_trailing_line_without_newline(self):
+        assert list(llm_adapter._iter_lines(_streamed(b"one\ntw", b"o"))) == [b"one", b"two"]
+
+    def test_multibyte_character_split_across_chunks(self):
+        body = '{"text": "caf\u00e9"}\n'.encode("utf-8")
+        split = body.index(b"\xa9")
+        lines = list(llm_adapter._iter_lines(_streamed(body[:split], body[split:])))
+        assert [line.decode("utf-8") for line in lines] == ['{"text": "caf\u00e9"}']
+
+
+class TestIterSseData:
+    """Tests for extracting data payloads from a server-sent event stream."""
+
+    def test_yields_data_until_done(self):
+        response = _streamed(b'data: {"a": 1}\n\ndata: {"b"', b': 2}\n\ndata: [DONE]\n\ndata: {"c": 3}\n')
+        assert list(llm_adapter._iter_sse_data(response)) == [b'{"a": 1}', b'{"b": 2}']
+
+    def test_data_without_space(self):
+        assert list(llm_adapter._iter_sse_data(_streamed(b'data:{"a": 1}\n'))) == [b'{"a": 1}']
+
+    def test_skips_comments_and_other_fields(self):
+        response = _streamed(b": keep-alive\nevent: message\nid: 7\ndata:\ndata: x\n")
+        assert list(llm_adapter._iter_sse_data(response)) == [b"x"]
+
+
+class TestParseError:
+    """Tests for summarising failed API responses."""
+
+    def test_error_string(self):
+        assert llm_adapter._parse_error(_response(400, b'{"error": "Model is loading"}')) == "Model is loading"
+
+    def test_nested_error_message(self):
+        body = b'{"error": {"message": "Invalid token", "type": "auth"}}'
+        assert llm_adapter._parse_error(_response(401, body)) == "Invalid token"
+
+    def test_html_body_truncated(self):
+        body = b"<html>" + b"x" * 500 + b"</html>"
+        assert llm_adapter._parse_error(_response(502, body, "text/html")) == body[:200].decode()
+
+    def test_large_json_body_not_decoded(self):
+        body = b'{"error": "' + b"x" * 5000 + b'"}'
+        assert llm_adapter._parse_error(_response(500, body)) == body[:200].decode()
+
+    def test_invalid_json_falls_back_to_text(self):
+        assert llm_adapter._parse_error(_response(500, b"{not json")) == "{not json"
+
+
+class TestCachingAdapter:
+    """Tests for the response cache wrapper."""
+
+    def test_miss_then_hit(self):
+        inner = FakeAdapter()
+        cache = CachingAdapter(inner)
+        assert cache.generate("login", "sys") == "echo: login"
+        assert cache.generate("login", "sys") == "echo: login"
+        assert len(inner.calls) == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_system_prompt_is_part_of_key(self):
+        inner = FakeAdapter()
+        cache = CachingAdapter(inner)
+        cache.generate("login", "sys A")
+        cache.generate("login", "sys B")
+        assert len(inner.calls) == 2
+
+    def test_evicts_least_recently_used(self):
+        inner = FakeAdapter()
+        cache = CachingAdapter(inner, max_entries=2)
+        cache.generate("a")
+        cache.generate("b")
+        cache.generate("a")  # "b" is now the least recently used
+        cache.generate("c")
+        cache.generate("a")
+        cache.generate("b")
+        assert [prompt for prompt, _ in inner.calls] == ["a", "b", "c", "b"]
+
+    def test_stream_replays_cached_response(self):
+        inner = FakeAdapter()
+        cache = CachingAdapter(inner)
+        assert "".join(cache.generate_stream("login")) == "echo:login"
+        assert list(cache.generate_stream("login")) == ["echo:login"]
+        assert len(inner.calls) == 1
+
+    def test_persists_to_response_store(self, tmp_path):
+        store = ResponseStore(db_path=tmp_path / "llm_cache.db")
+        try:
+            CachingAdapter(FakeAdapter(), store=store).generate("login")
+            inner = FakeAdapter()
+            assert CachingAdapter(inner, store=store).generate("login") == "echo: login"
+            assert inner.calls == []
+        finally:
+            store.close()
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent identical requests."""
+
+    def _run_concurrently(self, adapter, prompts):
+        results, errors = [], []
+
+        def call(prompt):
+            try:
+                results.append(adapter.coalesced_generate(prompt))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call, args=(p,)) for p in prompts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_identical_calls_share_one_request(self):
+        inner = FakeAdapter(delay=0.3)
+        results, errors = self._run_concurrently(inner, ["login"] * 5)
+        assert results == ["echo: login"] * 5
+        assert errors == []
+        assert len(inner.calls) == 1
+
+    def test_different_prompts_are_not_coalesced(self):
+        inner = FakeAdapter(delay=0.1)
+        results, _ = self._run_concurrently(inner, ["a", "b"])
+        assert sorted(results) == ["echo: a", "echo: b"]
+        assert len(inner.calls) == 2
+
+    def test_error_is_shared(self):
+        inner = FakeAdapter(delay=0.3, error=ConnectionError("down"))
+        results, errors = self._run_concurrently(inner, ["login"] * 3)
+        assert results == []
+        assert len(errors) == 3
+        assert len(inner.calls) == 1
+
+
+class TestTokenBucket:
+    """Tests for the rate limiter's token bucket."""
+
+    def test_acquire_within_capacity_does_not_wait(self):
+        bucket = _TokenBucket(per_minute=60)
+        start = time.monotonic()
+        bucket.acquire(60)
+        assert time.monotonic() - start < 0.05
+
+    def test_acquire_waits_for_refill(self):
+        bucket = _TokenBucket(per_minute=600)  # 10 tokens/s
+        bucket.acquire(600)
+        start = time.monotonic()
+        bucket.acquire(1)
+        assert time.monotonic() - start >= 0.08
+
+    def test_consume_can_go_negative(self):
+        bucket = _TokenBucket(per_minute=600)
+        bucket.consume(601)
+        start = time.monotonic()
+        bucket.acquire(1)
+        assert time.monotonic() - start >= 0.15
+
+
+class TestRateLimitedAdapter:
+    """Tests for the rate limiting wrapper."""
+
+    def test_max_concurrent(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        class Tracking(FakeAdapter):
+            __slots__ = ()
+
+            def generate(self, prompt, system_prompt=None):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+                return super().generate(prompt, system_prompt)
+
+        adapter = RateLimitedAdapter(Tracking(), max_concurrent=1)
+        threads = [threading.Thread(target=adapter.generate, args=(f"p{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 1
+
+    def test_charges_prompt_and_response_tokens(self):
+        adapter = RateLimitedAdapter(FakeAdapter(), tpm=1000)
+        with mock.patch.object(_TokenBucket, "acquire") as acquire, \
+                mock.patch.object(_TokenBucket, "consume") as consume:
+            adapter.generate("x" * 40, "y" * 8)
+        acquire.assert_called_once_with(11 + 3)
+        consume.assert_called_once_with(len("echo: " + "x" * 40) // 4 + 1)
+
+
+class TestCoalesceChunks:
+    """Tests for batching streamed deltas."""
+
+    def test_groups_up_to_max_chunks(self):
+        chunks = list(_coalesce_chunks(iter("abcdefghij"), max_wait=60, max_chunks=4))
+        assert chunks == ["abcd", "efgh", "ij"]
+
+    def test_zero_wait_passes_chunks_through(self):
+        assert list(_coalesce_chunks(iter(["a", "b"]), max_wait=0)) == ["a", "b"]
+
+    def test_empty_stream(self):
+        assert list(_coalesce_chunks(iter([]), max_wait=1)) == []
+
+
+class TestBatchWorker:
+    """Tests for the batch worker feeding local engines."""
+
+    def test_batches_concurrent_prompts(self):
+        batches = []
+
+        def generate(prompts):
+            batches.append(list(prompts))
+            return [p.upper() for p in prompts]
+
+        worker = _BatchWorker(generate, max_wait=0.2)
+        try:
+            futures = [worker.submit(p) for p in ("a", "b", "c")]
+            assert [f.result(timeout=5) for f in futures] == ["A", "B", "C"]
+            assert batches == [["a", "b", "c"]]
+        finally:
+            worker.stop()
+
+    def test_error_fails_whole_batch(self):
+        worker = _BatchWorker(lambda prompts: 1 / 0)
+        try:
+            with pytest.raises(ZeroDivisionError):
+                worker.submit("a").result(timeout=5)
+        finally:
+            worker.stop()
+
+    def test_rejects_prompts_after_stop(self):
+        worker = _BatchWorker(lambda prompts: prompts)
+        worker.stop()
+        with pytest.raises(RuntimeError):
+            worker.submit("a")
+
+
+class TestSharedModels:
+    """Tests for the process-wide local model cache."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(llm_adapter, "_MODEL_CACHE", {})
+        monkeypatch.setattr(llm_adapter, "_MODEL_BATCHERS", {})
+
+    def test_loads_once_per_key(self):
+        loader = mock.Mock(return_value="model")
+        assert llm_adapter._load_shared_model(("hf", "a"), loader) == "model"
+        assert llm_adapter._load_shared_model(("hf", "a"), loader) == "model"
+        assert loader.call_count == 1
+
+    def test_switching_model_evicts_previous(self):
+        llm_adapter._load_shared_model(("vllm", "a"), lambda: "engine a")
+        llm_adapter._load_shared_model(("hf", "a"), lambda: "pipeline a")
+        batcher = llm_adapter._shared_batcher(("vllm", "a"), lambda prompts: prompts)
+
+        llm_adapter._load_shared_model(("vllm", "b"), lambda: "engine b")
+        assert set(llm_adapter._MODEL_CACHE) == {("vllm", "b"), ("hf", "a")}
+        assert llm_adapter._MODEL_BATCHERS == {}
+        with pytest.raises(RuntimeError):
+            batcher.submit("p")
+
+    def test_one_batcher_per_model(self):
+        llm_adapter._load_shared_model(("vllm", "a"), lambda: "engine")
+        try:
+            first = llm_adapter._shared_batcher(("vllm", "a"), lambda prompts: prompts)
+            assert llm_adapter._shared_batcher(("vllm", "a"), lambda prompts: prompts) is first
+        finally:
+            first.stop()
+
+    def test_no_batcher_for_evicted_model(self):
+        with pytest.raises(RuntimeError):
+            llm_adapter._shared_batcher(("vllm", "gone"), lambda prompts: prompts)
+
+    def test_slow_load_does_not_block_other_models(self):
+        llm_adapter._load_shared_model(("hf", "a"), lambda: "pipeline")
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait(5)
+            return "engine"
+
+        results = []
+        waiters = [
+            threading.Thread(target=lambda: results.append(llm_adapter._load_shared_model(("vllm", "a"), slow_loader)))
+            for _ in range(2)
+        ]
+        waiters[0].start()
+        assert started.wait(5)
+        waiters[1].start()
+        # The lock is free while the engine loads: other keys are served.
+        assert llm_adapter._load_shared_model(("hf", "a"), mock.Mock()) == "pipeline"
+        release.set()
+        for thread in waiters:
+            thread.join(5)
+        assert results == ["engine", "engine"]
+
+    def test_failed_load_not_cached(self):
+        with pytest.raises(OSError):
+            llm_adapter._load_shared_model(("hf", "a"), mock.Mock(side_effect=OSError("no weights")))
+        assert llm_adapter._MODEL_CACHE == {}
+        assert llm_adapter._load_shared_model(("hf", "a"), lambda: "pipeline") == "pipeline"
+
+
+class TestVLLMConfig:
+    """Tests for reading vLLM options from settings."""
+
+    def test_from_settings(self):
+        settings = Settings(
+            vllm_model="Qwen/Qwen2.5-7B-Instruct", vllm_use_server=True, vllm_server_url="http://gpu:8000",
+            vllm_tensor_parallel_size=2, vllm_max_model_len=8192, vllm_kv_cache_dtype="fp8", vllm_timeout=30,
+        )
+        config = VLLMConfig.from_settings(settings)
+        assert config.model == "Qwen/Qwen2.5-7B-Instruct"
+        assert config.use_server and config.server_url == "http://gpu:8000"
+        assert (config.tensor_parallel_size, config.max_model_len, config.timeout) == (2, 8192, 30)
+        assert (config.dtype, config.kv_cache_dtype) == ("auto", "fp8")
+
+    def test_defaults_match_settings_defaults(self):
+        assert VLLMConfig.from_settings(Settings()) == VLLMConfig()
+
+    def test_builds_adapter(self):
+        adapter = llm_adapter._build_vllm(Settings(vllm_use_server=True, vllm_server_url="http://gpu:8000/"))
+        try:
+            assert isinstance(adapter, VLLMAdapter)
+            assert adapter.server_url == "http://gpu:8000"
+        finally:
+            adapter.close()
+
+
+class TestVLLMDtypes:
+    """Tests for picking weight and KV cache dtypes from the GPU generation."""
+
+    def _resolve(self, monkeypatch, capability, **options):
+        cuda = types.SimpleNamespace(
+            is_available=lambda: capability is not None,
+            get_device_capability=lambda: capability,
+        )
+        monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(cuda=cuda))
+        adapter = VLLMAdapter(**options)
+        try:
+            return adapter._resolve_dtypes()
+        finally:
+            adapter.close()
+
+    def test_pre_ampere(self, monkeypatch):
+        assert self._resolve(monkeypatch, (7, 5)) == ("auto", "auto")
+
+    def test_ampere_uses_bf16(self, monkeypatch):
+        assert self._resolve(monkeypatch, (8, 0)) == ("bfloat16", "auto")
+
+    def test_ada_uses_fp8_kv_cache(self, monkeypatch):
+        assert self._resolve(monkeypatch, (8, 9)) == ("bfloat16", "fp8")
+
+    def test_explicit_settings_passed_through(self, monkeypatch):
+        resolved = self._resolve(monkeypatch, (9, 0), dtype="float16", kv_cache_dtype="auto")
+        assert resolved == ("float16", "auto")
+
+    def test_no_gpu(self, monkeypatch):
+        assert self._resolve(monkeypatch, None) == ("auto", "auto")
+
+
+class TestHuggingFaceFallback:
+    """Tests for the chat-then-legacy fallback of the HuggingFace API path."""
+
+    @pytest.fixture
+    def adapter(self):
+        adapter = HuggingFaceAdapter("org/model", use_api=True, api_token="hf_test")
+        yield adapter
+        adapter.close()
+
+    def test_legacy_not_called_when_chat_succeeds(self, adapter):
+        with mock.patch.object(HuggingFaceAdapter, "_chat_attempt", return_value=("chat", None)), \
+                mock.patch.object(HuggingFaceAdapter, "_legacy_attempt") as legacy:
+            assert adapter.generate("p") == "chat"
+        legacy.assert_not_called()
+
+    def test_legacy_used_after_chat_fails(self, adapter):
+        with mock.patch.object(HuggingFaceAdapter, "_chat_attempt", return_value=(None, "Chat API (503)")), \
+                mock.patch.object(HuggingFaceAdapter, "_legacy_attempt", return_value=("legacy", None)):
+            assert adapter.generate("p") == "legacy"
+
+    def test_both_failing_raises(self, adapter):
+        with mock.patch.object(HuggingFaceAdapter, "_chat_attempt", return_value=(None, "Chat API (503)")), \
+                mock.patch.object(HuggingFaceAdapter, "_legacy_attempt", return_value=(None, (404, "not found"))):
+            with pytest.raises(ConnectionError, match="Legacy API \\(404\\)"):
+                adapter.generate("p")
+
+
+    def test_failed_stream_goes_straight_to_legacy(self, adapter):
+        response = _response(503, b'{"error": "Model is loading"}')
+        with mock.patch.object(adapter._session, "post", return_value=response) as post, \
+                mock.patch.object(HuggingFaceAdapter, "_legacy_attempt", return_value=("legacy", None)):
+            assert list(adapter.generate_stream("p")) == ["legacy"]
+        assert post.call_count == 1  # The chat request is not repeated
+
+    def test_failed_stream_raises_combined_error(self, adapter):
+        response = _response(503, b'{"error": "Model is loading"}')
+        with mock.patch.object(adapter._session, "post", return_value=response), \
+                mock.patch.object(HuggingFaceAdapter, "_legacy_attempt", return_value=(None, (404, "not found"))):
+            with pytest.raises(ConnectionError, match="Chat API \\(503\\): Model is loading"):
+                list(adapter.generate_stream("p"))
+
+
+class TestProviderRegistry:
+    """Tests for dispatching LLMAdapter through PROVIDER_REGISTRY."""
+
+    def test_every_provider_registered(self):
+        assert set(llm_adapter.PROVIDER_REGISTRY) == {p.value for p in LLMProvider}
+
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError, match="Unknown LLM provider: nope"):
+            LLMAdapter(Settings(llm_provider="nope"))
+
+    def test_dispatches_to_registered_builder(self, monkeypatch):
+        fake = FakeAdapter()
+        monkeypatch.setitem(llm_adapter.PROVIDER_REGISTRY, "fake", lambda settings: fake)
+        adapter = LLMAdapter(Settings(llm_provider="fake", llm_cache_enabled=False))
+        assert adapter.generate("login") == "echo: login"
+        assert fake.calls == [("login", None)]
+
+    def test_builds_configured_provider(self):
+        adapter = LLMAdapter(Settings(llm_provider="ollama", ollama_model="qwen2.5:7b", llm_cache_enabled=False))
+        try:
+            assert isinstance(adapter._adapter, OllamaAdapter)
+            assert adapter._adapter.model == "qwen2.5:7b"
+        finally:
+            adapter.close()
+
+
+class TestCodeAdapterCache:
+    """Tests for memoizing probed Ollama code-model adapters."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(llm_adapter, "_code_adapter_cache", {})
+
+    def _settings(self, **overrides):
+        return Settings(llm_provider="ollama", llm_cache_enabled=False, **overrides)
+
+    def test_probes_once_per_settings(self):
+        with mock.patch.object(OllamaAdapter, "is_available", return_value=True) as probe:
+            first = llm_adapter.get_code_llm_adapter(self._settings())
+            second = llm_adapter.get_code_llm_adapter(self._settings())
+        assert isinstance(first, CodeLLMAdapter)
+        assert second._adapter is first._adapter
+        assert probe.call_count == 1
+
+    def test_changed_settings_probe_again(self):
+        with mock.patch.object(OllamaAdapter, "is_available", return_value=True) as probe:
+            first = llm_adapter.get_code_llm_adapter(self._settings())
+            other_model = llm_adapter.get_code_llm_adapter(self._settings(ollama_code_model="qwen2.5-coder:7b"))
+            rate_limited = llm_adapter.get_code_llm_adapter(self._settings(llm_max_rpm=30))
+        assert other_model._adapter.model == "qwen2.5-coder:7b"
+        assert isinstance(rate_limited._adapter, RateLimitedAdapter)
+        assert len({id(a._adapter) for a in (first, other_model, rate_limited)}) == 3
+        assert probe.call_count == 3
+
+    def test_unavailable_model_not_cached(self):
+        with mock.patch.object(OllamaAdapter, "is_available", return_value=False) as probe:
+            adapter = llm_adapter.get_code_llm_adapter(self._settings())
+            llm_adapter.get_code_llm_adapter(self._settings())
+        assert not isinstance(adapter, CodeLLMAdapter)
+        assert probe.call_count == 2
+        assert llm_adapter._code_adapter_cache == {}
+
+    def test_clear(self):
+        with mock.patch.object(OllamaAdapter, "is_available", return_value=True) as probe:
+            llm_adapter.get_code_llm_adapter(self._settings())
+            llm_adapter.clear_code_adapter_cache()
+            llm_adapter.get_code_llm_adapter(self._settings())
+        assert probe.call_count == 2
+
+
+class TestLLMAdapterWarmup:
+    """Tests for opt-in connection warmup."""
+
+    def test_no_warmup_by_default(self):
+        with mock.patch.object(OllamaAdapter, "warmup") as warmup:
+            LLMAdapter(Settings(llm_provider="ollama")).close()
+        warmup.assert_not_called()
+
+    def test_warmup_when_requested(self):
+        called = threading.Event()
+        with mock.patch.object(OllamaAdapter, "warmup", side_effect=called.set):
+            adapter = LLMAdapter(Settings(llm_provider="ollama"), warmup=True)
+            assert called.wait(5)
+        adapter.close()
@@ -1,5 +1,5 @@
 """
-Tests for data models: TestStep, ManualTestCase, AutomationScript, TestSuite, Requirement.
+Tests for data models: TestStep, ManualTestCase, AutomationScript, TestSuite, Requirement, ClientContext.
 """
 import json
 import pytest
@@ -9,6 +9,7 @@ from models.test_case import (
     Priority, TestStatus, TestCategory
 )
 from models.requirement import Requirement
+from models.client_context import ClientContext
 
 
 # ──────────────────────────────────────────────
@@ -91,6 +92,28 @@ class TestManualTestCase:
         assert restored.test_id == sample_manual_test.test_id
         assert len(restored.test_steps) == 4
 
+    def test_from_dict_tolerates_llm_output(self):
+        data = {
+            "test_id": "TC_009",
+            "confidence": 0.9,  # Unknown key from the model
+            "test_steps": [{"action": "Open login page"}, {"action": "Submit", "step_number": 5}],
+        }
+        restored = ManualTestCase.from_dict(data)
+        assert restored.test_name == "Unnamed Test"
+        assert restored.description == ""
+        assert [s.step_number for s in restored.test_steps] == [1, 5]
+        assert restored.test_steps[0].expected_result == ""
+        assert isinstance(data["test_steps"][0], dict)  # Input left untouched
+
+    def test_from_dict_converts_string_steps(self):
+        restored = ManualTestCase.from_dict({"test_id": "TC_010", "test_steps": ["Open page", "Click login"]})
+        assert [(s.step_number, s.action) for s in restored.test_steps] == [(1, "Open page"), (2, "Click login")]
+        assert "Click login" in restored.get_steps_text()
+
+    def test_from_dict_rejects_unknown_step_types(self):
+        with pytest.raises(TypeError):
+            ManualTestCase.from_dict({"test_id": "TC_011", "test_steps": [42]})
+
     def test_to_text(self, sample_manual_test):
         text = sample_manual_test.to_text()
         assert "TC_001" in text
@@ -242,6 +265,10 @@ class TestRequirement:
         req = Requirement(filename="user_login_flow.pdf", content="test")
         assert req.get_display_name() == "User Login Flow"
 
+    def test_get_display_name_strips_only_trailing_extension(self):
+        req = Requirement(filename="release.txt-notes_v2.PDF", content="test")
+        assert req.get_display_name() == "Release.Txt Notes V2"
+
     def test_get_content_preview_short(self):
         req = Requirement(filename="t.txt", content="short content")
         assert req.get_content_preview() == "short content"
@@ -261,6 +288,35 @@ class TestRequirement:
         assert stats["line_count"] > 0
 
 
+# ──────────────────────────────────────────────
+# ClientContext
+# ──────────────────────────────────────────────
+
+class TestClientContext:
+    """Tests for the ClientContext model."""
+
+    def test_get_context_text(self, sample_client_context):
+        text = sample_client_context.get_context_text()
+        assert "## Project: Acme Portal" in text
+        assert "- Always start from home page" in text
+        assert "- Follow AAA pattern in tests" in text
+
+    def test_context_text_refreshes_on_assignment(self, sample_client_context):
+        first = sample_client_context.get_context_text()
+        assert sample_client_context.get_context_text() is first
+
+        sample_client_context.business_rules = ["Orders over $100 ship free"]
+        text = sample_client_context.get_context_text()
+        assert "- Orders over $100 ship free" in text
+        assert "Users must verify email" not in text
+
+    def test_to_dict_from_dict(self, sample_client_context):
+        sample_client_context.get_context_text()
+        d = sample_client_context.to_dict()
+        assert "_context_text" not in d
+        assert ClientContext.from_dict(d) == sample_client_context
+
+
 # ──────────────────────────────────────────────
 # Enums
 # ──────────────────────────────────────────────
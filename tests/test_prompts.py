@@ -55,6 +55,17 @@ class TestPromptTemplates:
         assert prompt.count("y") <= 1010
         assert prompt.count("y") < 2000  # Definitely truncated from original
 
+    def test_batch_manual_test_prompt_numbers_documents(self):
+        prompt = PromptTemplates.get_batch_manual_test_prompt(
+            requirements=["Users must log in", "Admins can export reports"],
+            include_edge_cases=False
+        )
+        assert "these 2 requirement documents" in prompt
+        assert "Requirement 1:\nUsers must log in" in prompt
+        assert "Requirement 2:\nAdmins can export reports" in prompt
+        assert '"req_id"' in prompt
+        assert "Edge cases" not in prompt
+
     def test_gherkin_prompt(self):
         prompt = PromptTemplates.get_gherkin_prompt(
             manual_tests='[{"test_id": "TC_001"}]',
@@ -82,6 +93,18 @@ class TestPromptTemplates:
         assert "scripts" in prompt
         assert "@playwright/test" in prompt
 
+    def test_combined_automation_prompt_only_requested_targets(self):
+        prompt = PromptTemplates.get_combined_automation_prompt(
+            manual_tests='[{"test_id": "TC_001"}]',
+            requirements_summary="Login",
+            targets=("selenium", "playwright")
+        )
+        assert '"selenium"' in prompt
+        assert '"playwright"' in prompt
+        assert '"gherkin"' not in prompt
+        assert prompt.count("TC_001") >= 1
+        assert "@playwright/test" in prompt
+
     def test_enhancement_prompt(self):
         prompt = PromptTemplates.get_enhancement_prompt(
             current_tests='[{"test_id": "TC_001"}]',
@@ -97,7 +120,9 @@ class TestPromptTemplates:
     def test_all_prompts_request_json(self):
         """Every prompt template should ask for JSON output."""
         assert "JSON" in PromptTemplates.MANUAL_TEST_GENERATION
+        assert "JSON" in PromptTemplates.BATCH_MANUAL_TEST_GENERATION
         assert "JSON" in PromptTemplates.GHERKIN_GENERATION
         assert "JSON" in PromptTemplates.SELENIUM_GENERATION
         assert "JSON" in PromptTemplates.PLAYWRIGHT_GENERATION
+        assert "JSON" in PromptTemplates.COMBINED_AUTOMATION_GENERATION
         assert "JSON" in PromptTemplates.ENHANCE_TESTS
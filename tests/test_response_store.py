@@ -0,0 +1,60 @@
+"""
+Tests for the persistent LLM response store (storage/response_store.py).
+"""
+import pytest
+
+from storage.response_store import ResponseStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a response store backed by a temporary database."""
+    s = ResponseStore(db_path=tmp_path / "llm_cache.db", max_entries=3)
+    yield s
+    s.close()
+
+
+class TestResponseStore:
+    """Tests for ResponseStore get/put/eviction."""
+
+    def test_put_and_get(self, store):
+        store.put(b"k1", "Feature: Login", model="mistral")
+        assert store.get(b"k1") == "Feature: Login"
+
+    def test_get_missing_returns_none(self, store):
+        assert store.get(b"missing") is None
+
+    def test_roundtrips_unicode(self, store):
+        store.put(b"k", "Ünïcödé ✓ 測試")
+        assert store.get(b"k") == "Ünïcödé ✓ 測試"
+
+    def test_put_replaces_existing(self, store):
+        store.put(b"k", "old")
+        store.put(b"k", "new")
+        assert store.get(b"k") == "new"
+        assert len(store) == 1
+
+    def test_evicts_least_recently_used(self, store):
+        for i in range(3):
+            store.put(f"k{i}".encode(), f"v{i}")
+        store.get(b"k0")  # k1 is now the least recently used
+        store.put(b"k3", "v3")
+
+        assert len(store) == 3
+        assert store.get(b"k1") is None
+        assert store.get(b"k0") == "v0"
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "llm_cache.db"
+        first = ResponseStore(db_path=path)
+        first.put(b"k", "cached")
+        first.close()
+
+        second = ResponseStore(db_path=path)
+        assert second.get(b"k") == "cached"
+        second.close()
+
+    def test_clear(self, store):
+        store.put(b"k", "v")
+        store.clear()
+        assert len(store) == 0
@@ -0,0 +1,258 @@
+"""
+Tests for the test generation engine (core/test_generator.py).
+The LLM is replaced by a fake returning canned responses.
+"""
+import json
+
+import pytest
+
+from core import test_generator
+from core.test_generator import _TestCaseStream, _pack_batches, _within_json_depth, _MAX_JSON_DEPTH
+from models.requirement import Requirement
+from config.settings import Settings
+
+
+class FakeLLM:
+    """Stand-in for LLMAdapter that returns queued responses in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate(self, prompt, system_prompt=None):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+    def generate_stream(self, prompt, system_prompt=None):
+        response = self.generate(prompt, system_prompt)
+        for i in range(0, len(response), 7):
+            yield response[i:i + 7]
+
+
+def _test_case(test_id, name="Login works"):
+    return {
+        "test_id": test_id,
+        "test_name": name,
+        "description": "",
+        "test_steps": [{"step_number": 1, "action": "Open } page {", "expected_result": "Shown ]"}],
+    }
+
+
+def _requirement(name, size):
+    return Requirement(filename=f"{name}.txt", content="x" * size, file_type="txt")
+
+
+@pytest.fixture
+def generator():
+    gen = test_generator.TestGenerator(llm_adapter=FakeLLM())
+    yield gen
+    gen.close()
+
+
+class TestTestCaseStream:
+    """Tests for counting test cases in a streamed response."""
+
+    def _feed(self, text, size):
+        stream = _TestCaseStream()
+        counts = [stream.feed(text[i:i + size]) for i in range(0, len(text), size)]
+        return stream, counts
+
+    def test_counts_completed_test_cases(self):
+        text = json.dumps({"test_cases": [_test_case("TC_001"), _test_case("TC_002")]})
+        for size in (1, 3, 16, len(text)):
+            stream, counts = self._feed(text, size)
+            assert stream.count == sum(counts) == 2
+            assert stream.text == text
+
+    def test_partial_object_not_counted(self):
+        text = json.dumps({"test_cases": [_test_case("TC_001"), _test_case("TC_002")]})
+        stream = _TestCaseStream()
+        stream.feed(text[:-20])
+        assert stream.count == 1
+
+    def test_ignores_objects_outside_the_array(self):
+        text = json.dumps({"meta": {"a": 1}, "test_cases": [_test_case("TC_001")], "summary": {"b": 2}})
+        stream, _ = self._feed(text, 5)
+        assert stream.count == 1
+
+    def test_key_split_across_chunks(self):
+        stream = _TestCaseStream()
+        stream.feed('{"test_ca')
+        stream.feed('ses": [')
+        assert stream.feed(json.dumps(_test_case("TC_001"))) == 1
+
+    def test_streamed_generation_reports_progress(self):
+        response = json.dumps({"test_cases": [_test_case("TC_001"), _test_case("TC_002")]})
+        seen = []
+        with test_generator.TestGenerator(llm_adapter=FakeLLM(response)) as gen:
+            tests = gen._generate_manual_tests("Login", "", True, True, True, on_test_parsed=seen.append)
+        assert seen == [1, 2]
+        assert [t.test_id for t in tests] == ["TC_001", "TC_002"]
+
+
+class TestExtractJson:
+    """Tests for pulling JSON out of LLM responses."""
+
+    def test_fenced_block(self, generator):
+        text = 'Here you go:\n```json\n{"test_cases": []}\n```'
+        assert generator._extract_json(text) == {"test_cases": []}
+
+    def test_raw_object_with_surrounding_text(self, generator):
+        text = 'Sure! {"a": {"b": "}"}} Hope that helps {not json}'
+        assert generator._extract_json(text) == {"a": {"b": "}"}}
+
+    def test_skips_invalid_braces_before_object(self, generator):
+        assert generator._extract_json('{oops} then {"ok": true}') == {"ok": True}
+
+    def test_no_json(self, generator):
+        assert generator._extract_json("No JSON here") is None
+
+    def test_rejects_deep_nesting(self, generator):
+        text = "[" * (_MAX_JSON_DEPTH + 1) + "]" * (_MAX_JSON_DEPTH + 1)
+        assert generator._extract_json('{"a": ' + text + "}") is None
+
+
+class TestJsonDepth:
+    """Tests for the nesting guard applied before JSON decoding."""
+
+    def test_within_limit(self):
+        assert _within_json_depth('{"a": [1, {"b": 2}]}', limit=3)
+
+    def test_over_limit(self):
+        assert not _within_json_depth('{"a": [1, {"b": 2}]}', limit=2)
+
+    def test_brackets_in_strings_ignored(self):
+        assert _within_json_depth('{"a": "[[[[{{{{\\"]]"}', limit=1)
+
+
+class TestPackBatches:
+    """Tests for grouping requirement documents into batched calls."""
+
+    def test_packs_in_order_within_budget(self):
+        requirements = [_requirement(str(i), size) for i, size in enumerate([400, 500, 300, 800, 100])]
+        assert _pack_batches(requirements, 1000) == [[0, 1], [2], [3, 4]]
+
+    def test_oversized_document_gets_own_batch(self):
+        requirements = [_requirement("a", 100), _requirement("b", 2500), _requirement("c", 100)]
+        assert _pack_batches(requirements, 1000) == [[0], [1], [2]]
+
+    def test_counts_only_prompt_truncated_text(self):
+        requirements = [_requirement("a", 10000), _requirement("b", 10000)]
+        assert _pack_batches(requirements, 6000) == [[0, 1]]
+
+    def test_empty(self):
+        assert _pack_batches([], 1000) == []
+
+    def test_empty_content(self):
+        requirements = [_requirement("a", 0), _requirement("b", 600), _requirement("c", 0)]
+        assert _pack_batches(requirements, 1000) == [[0, 1, 2]]
+
+
+class TestGenerateSuitesBatch:
+    """Tests for multi-document manual test generation."""
+
+    def test_one_call_per_batch(self):
+        response = json.dumps({"requirements": [
+            {"req_id": 1, "test_cases": [_test_case("TC_001", "A")]},
+            {"req_id": 2, "test_cases": [_test_case("TC_001", "B1"), _test_case("TC_002", "B2")]},
+        ]})
+        llm = FakeLLM(response)
+        with test_generator.TestGenerator(llm_adapter=llm) as gen:
+            suites = gen.generate_test_suites_batch([_requirement("a", 100), _requirement("b", 100)])
+        assert len(llm.prompts) == 1
+        assert [[t.test_name for t in s.manual_tests] for s in suites] == [["A"], ["B1", "B2"]]
+        assert [s.requirement_source for s in suites] == ["a.txt", "b.txt"]
+
+    def test_missing_document_regenerated_alone(self):
+        batched = json.dumps({"requirements": [{"req_id": 1, "test_cases": [_test_case("TC_001", "A")]}]})
+        single = json.dumps({"test_cases": [_test_case("TC_001", "B")]})
+        llm = FakeLLM(batched, single)
+        with test_generator.TestGenerator(llm_adapter=llm) as gen:
+            suites = gen.generate_test_suites_batch([_requirement("a", 100), _requirement("b", 100)])
+        assert len(llm.prompts) == 2
+        assert [s.manual_tests[0].test_name for s in suites] == ["A", "B"]
+
+
+class TestPromptCompression:
+    """Tests for when the requirements summary is compressed."""
+
+    def _run(self, monkeypatch, **stages):
+        compressed = []
+        monkeypatch.setattr(test_generator, "_compress_text", lambda text: compressed.append(text) or text)
+        manual = json.dumps({"test_cases": [_test_case("TC_001")]})
+        llm = FakeLLM(manual, json.dumps({"feature_files": [], "scripts": []}))
+        with test_generator.TestGenerator(llm_adapter=llm) as gen:
+            gen.settings = Settings(enable_prompt_compression=True)
+            gen._code_llm = llm
+            gen.generate_test_suite(_requirement("a", 100), **stages)
+        return compressed
+
+    def test_compressed_for_gherkin(self, monkeypatch):
+        assert len(self._run(monkeypatch, generate_gherkin=True)) == 1
+
+    def test_not_compressed_without_gherkin(self, monkeypatch):
+        assert self._run(monkeypatch) == []
+        assert self._run(monkeypatch, generate_selenium=True) == []
+
+
+class TestParseManualTests:
+    """Tests for turning manual-test JSON into test cases."""
+
+    def test_string_steps_converted(self, generator):
+        response = json.dumps({"test_cases": [{"test_id": "TC_001", "test_steps": ["Open page", "Log in"]}]})
+        tests = generator._parse_manual_tests(response)
+        assert [s.action for s in tests[0].test_steps] == ["Open page", "Log in"]
+
+    def test_malformed_entry_skipped(self, generator):
+        response = json.dumps({"test_cases": [{"test_id": "TC_001", "test_steps": [42]}, _test_case("TC_002")]})
+        tests = generator._parse_manual_tests(response)
+        assert [t.test_id for t in tests] == ["TC_002"]
+
+    def test_missing_ids_numbered_by_position(self, generator):
+        response = json.dumps({"test_cases": [{"test_name": "A"}, {"test_name": "B"}]})
+        assert [t.test_id for t in generator._parse_manual_tests(response)] == ["TC_001", "TC_002"]
+
+
+class TestExtractRawGherkin:
+    """Tests for the plain-text Gherkin fallback."""
+
+    def test_splits_features_and_counts_scenarios(self, generator):
+        response = (
+            "Here are the features:\n"
+            "Feature: User Login\n  Scenario: Valid login\n  Scenario Outline: Bad password\n"
+            "Feature: Logout\n  Scenario: Logout works\n"
+        )
+        scripts = generator._extract_raw_gherkin(response)
+        assert [s.feature_name for s in scripts] == ["User Login", "Logout"]
+        assert [s.scenario_count for s in scripts] == [2, 1]
+        assert scripts[0].filename == "user_login.feature"
+
+    def test_feature_mid_line_does_not_split(self, generator):
+        response = "Feature: Login\n  Scenario: Mentions Feature: inline\n"
+        assert len(generator._extract_raw_gherkin(response)) == 1
+
+    def test_feature_without_scenarios_dropped(self, generator):
+        assert generator._extract_raw_gherkin("Feature: Empty\n") == []
+
+
+class TestParseCombinedScripts:
+    """Tests for splitting a combined automation response per target."""
+
+    def test_splits_sections(self, generator):
+        response = json.dumps({
+            "gherkin": {"feature_files": [{"filename": "login.feature", "content": "Feature: Login"}]},
+            "selenium": [{"filename": "test_login.py", "content": "def test_login(): pass"}],
+        })
+        results = generator._parse_combined_scripts(response, ("gherkin", "selenium"))
+        assert [s.filename for s in results["gherkin"]] == ["login.feature"]
+        assert [s.filename for s in results["selenium"]] == ["test_login.py"]
+        assert results["selenium"][0].script_type == "selenium"
+
+    def test_missing_section_falls_back_to_code_blocks(self, generator):
+        response = (
+            '{"gherkin": {"feature_files": []}}\n'
+            "```python\nfrom selenium import webdriver\ndef test_login(): pass\n```"
+        )
+        results = generator._parse_combined_scripts(response, ("selenium",))
+        assert len(results["selenium"]) == 1
+        assert "webdriver" in results["selenium"][0].content